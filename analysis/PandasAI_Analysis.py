@@ -1,12 +1,34 @@
-from pandasai import SmartDataframe
-from pandasai.llm import OpenAI
 from dotenv import load_dotenv
-import os
 from gathering_data.data_gatherer import NaverRECrawler
+from gathering_data.metrics import measure
+from analysis.query_catalog import find_query, summarize
 import streamlit as st
 
 load_dotenv()
 
+# 크롤링 결과 열 -> 분석용 열
+COLUMN_MAPPING = {
+    'Name': 'Name',
+    'minDeal': 'MinPrice',
+    'maxDeal': 'MaxPrice',
+    'representativeArea': 'Area',
+    'Type': 'PropertyType'
+}
+
+
+@st.cache_resource
+def get_llm(api_key, model_name="gpt-4o"):
+    # 세션 간에 공유하는 LLM 클라이언트 (pandasai는 LLM 질문이 처음 들어올 때 import)
+    from pandasai.llm import OpenAI
+    return OpenAI(api_token=api_key, model_name=model_name)
+
+
+def to_analysis_frame(data, extra=[]):
+    columns = list(COLUMN_MAPPING.keys()) + [c for c in extra if c not in COLUMN_MAPPING]
+    df = data[columns].copy()
+    df.columns = [COLUMN_MAPPING.get(c, c) for c in columns]
+    return df
+
 
 def format_analysis_results(df, query_result):
     """
@@ -35,7 +57,8 @@ def format_analysis_results(df, query_result):
         return {"error": f"Formatting error: {str(e)}"}
 
 
-def run(input_query, model, location=None, data=None):
+def run(input_query, model, location=None, data=None, question=None):
+    # question: 미리 정의된 질문이면 LLM 없이 카탈로그 쿼리로 바로 처리
     try:
         # Data retrieval
         if data is None and location is not None:
@@ -44,17 +67,16 @@ def run(input_query, model, location=None, data=None):
         elif data is None:
             raise ValueError("Either location or data must be provided")
 
-        # Column mapping
-        column_mapping = {
-            'Name': 'Name',
-            'minDeal': 'MinPrice',
-            'maxDeal': 'MaxPrice',
-            'representativeArea': 'Area',
-            'Type': 'PropertyType'
-        }
+        query = find_query(question)
+        if query is not None:
+            with measure('stage_seconds', stage='catalog'):
+                matched = query.run(data)
+            return to_analysis_frame(matched, query.show), {
+                "type": "string",
+                "value": summarize(question, query, matched, len(data))
+            }
 
-        df = data[list(column_mapping.keys())].copy()
-        df.columns = list(column_mapping.values())
+        df = to_analysis_frame(data)
 
         # OpenAI model handling
         if model == "openai":
@@ -62,7 +84,8 @@ def run(input_query, model, location=None, data=None):
             if not OPENAI_API_KEY:
                 raise ValueError("OpenAI API key not found")
 
-            llm = OpenAI(api_token=st.secrets["api_key"], model_name="gpt-4o")
+            from pandasai import SmartDataframe
+            llm = get_llm(OPENAI_API_KEY)
             sdf = SmartDataframe(df, config={
                 "llm": llm,
                 "verbose": True,
@@ -84,7 +107,8 @@ def run(input_query, model, location=None, data=None):
             3. Notable properties that match the criteria
             """
 
-            result = sdf.chat(prompt)
+            with measure('external_seconds', service='pandasai'):
+                result = sdf.chat(prompt)
 
             # Ensure proper output format
             if isinstance(result, dict) and "type" in result and "value" in result:
@@ -0,0 +1,121 @@
+import codecs
+import hashlib
+import io
+import os
+import numpy as np
+import pandas as pd
+from gathering_data.cache import NMemoryCache
+
+# 업로드 파일 -> DataFrame, 같은 내용(해시)은 다시 파싱하지 않음
+UPLOAD_TYPES = ['csv', 'xlsx', 'parquet']
+CSV_ENCODINGS = ['utf-8', 'cp949']  # utf-8이 아니면 기존 기본값(cp949)으로 다시 읽음
+DETECT_CHUNK = 1 << 20  # 인코딩 검사 단위 (bytes)
+CATEGORY_RATIO = 0.5  # 고유값 비율이 이보다 낮은 문자열 열은 category로
+CATEGORY_SAMPLE = 10000  # 앞부분 표본의 고유값 비율이 높으면 전체는 세지 않음
+
+# DataFrame 전체를 보관하므로 최근 파일 2개만, 파싱 결과가 INGEST_CACHE_MAX_BYTES보다 크면 캐시하지 않음
+INGEST_CACHE_SIZE = 2
+INGEST_CACHE_MAX_BYTES = 256 * 1024 * 1024
+INGEST_TTL = 60 * 60
+_tables = NMemoryCache(INGEST_CACHE_SIZE)
+
+
+def hash_bytes(data) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def get_extension(name):
+    return os.path.splitext(name)[1].lower().lstrip('.')
+
+
+def detect_encoding(data):
+    # pyarrow는 utf-8이 아닌 값을 오류 없이 binary 열로 읽으므로 먼저 전체를 검사
+    # (한 번에 str로 만들지 않고 조각씩 디코딩해 최대 메모리를 늘리지 않음)
+    view = memoryview(data)
+    for encoding in CSV_ENCODINGS[:-1]:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            for start in range(0, len(view), DETECT_CHUNK):
+                decoder.decode(view[start:start + DETECT_CHUNK])
+            decoder.decode(b'', final=True)
+            return encoding
+        except UnicodeDecodeError:
+            pass
+    return CSV_ENCODINGS[-1]
+
+
+def read_csv(data):
+    # pyarrow 멀티스레드 파서 (pandas 1.5의 engine='pyarrow'는 encoding을 넘기지 않아 직접 호출)
+    encoding = detect_encoding(data)
+    try:
+        from pyarrow import csv
+    except ImportError:
+        return pd.read_csv(io.BytesIO(data), encoding=encoding, low_memory=False)
+    return csv.read_csv(io.BytesIO(data), read_options=csv.ReadOptions(encoding=encoding)).to_pandas()
+
+
+def read_table(data, name) -> pd.DataFrame:
+    ext = get_extension(name)
+    if ext == 'csv':
+        return read_csv(data)
+    if ext == 'xlsx':
+        return pd.read_excel(io.BytesIO(data))
+    if ext == 'parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    raise ValueError(f'지원하지 않는 파일 형식: {name}')
+
+
+def to_exact_float32(s: pd.Series):
+    # pd.to_numeric(downcast='float')는 오차를 허용하므로 float32로 되돌렸을 때 같을 때만 변환
+    if s.dtype != np.float64: return s
+    values = s.to_numpy()
+    small = values.astype(np.float32)
+    if np.array_equal(small.astype(np.float64), values, equal_nan=True):
+        return pd.Series(small, index=s.index, name=s.name)
+    return s
+
+
+def is_categorical(s: pd.Series):
+    if len(s) == 0: return False
+    sample = s.iloc[:CATEGORY_SAMPLE]
+    if len(s) > CATEGORY_SAMPLE and sample.nunique(dropna=True) >= len(sample) * CATEGORY_RATIO: return False
+    return s.nunique(dropna=True) < len(s) * CATEGORY_RATIO
+
+
+def downcast(df: pd.DataFrame) -> pd.DataFrame:
+    # 값이 바뀌지 않는 범위에서 작은 dtype으로 (정수 -> 최소 부호 있는 정수, 실수 -> float32가 같을 때만)
+    # unsigned로 바꾸면 이후 차이 계산 등에서 음수가 wrap되므로 부호 있는 정수만 사용
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_bool_dtype(s):
+            out[col] = s
+        elif pd.api.types.is_integer_dtype(s):
+            out[col] = pd.to_numeric(s, downcast='integer')
+        elif pd.api.types.is_float_dtype(s):
+            out[col] = to_exact_float32(s)
+        elif s.dtype == object and is_categorical(s):
+            out[col] = s.astype('category')
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def get_memory_usage(df: pd.DataFrame):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def load_table(data, name, digest=None):
+    # (digest, DataFrame), 캐시된 DataFrame은 공유되므로 수정하지 말고 복사해서 사용
+    digest = hash_bytes(data) if digest is None else digest
+    key = (digest, get_extension(name))
+    df = _tables.get(key)
+    if df is NMemoryCache.MISS:
+        df = downcast(read_table(data, name))
+        if get_memory_usage(df) <= INGEST_CACHE_MAX_BYTES:
+            _tables.set(key, df, INGEST_TTL)
+    return digest, df
+
+
+def clear_table_cache():
+    _tables.clear()
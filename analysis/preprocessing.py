@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from gathering_data.cache import NMemoryCache
+
+# Raw_Data_Visualization STEP 2 체크박스 -> 선택한 열에 대한 열 단위 전처리
+MISSING_VALUES = 'missing_values'
+OUTLIERS = 'outliers'
+STANDARDIZATION = 'standardization'
+NORMALIZATION = 'normalization'
+# 적용 순서 (결측치를 먼저 채우고, 이상치 행을 뺀 뒤 남은 값으로 스케일링)
+STEPS = [MISSING_VALUES, OUTLIERS, STANDARDIZATION, NORMALIZATION]
+
+IQR_K = 1.5  # Q1 - k*IQR ~ Q3 + k*IQR 밖이면 이상치
+
+PREPROCESS_CACHE_SIZE = 16
+PREPROCESS_TTL = 60 * 60
+_results = NMemoryCache(PREPROCESS_CACHE_SIZE)
+
+
+def is_numeric(s: pd.Series):
+    return pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+
+
+def to_arrays(df: pd.DataFrame, columns):
+    # 숫자 열 -> 열마다 연속된 float64 배열, 결측치는 NaN
+    return [df[col].to_numpy(dtype=np.float64, na_value=np.nan, copy=True) for col in columns]
+
+
+def get_quantiles(v: np.ndarray, q):
+    # NaN을 뺀 값의 분위수 (np.nanpercentile보다 빠름)
+    v = v[~np.isnan(v)]
+    return np.quantile(v, q) if len(v) else np.full(len(q), np.nan)
+
+
+def impute(arrays, others: pd.DataFrame, report):
+    # 숫자 열은 중앙값, 나머지 열은 최빈값
+    imputed = 0
+    for v in arrays:
+        missing = np.isnan(v)
+        n = int(missing.sum())
+        if n == 0 or n == len(v): continue
+        v[missing] = get_quantiles(v, [0.5])[0]
+        imputed += n
+    for col in others.columns:
+        s = others[col]
+        n = int(s.isna().sum())
+        if n == 0 or n == len(s): continue
+        others[col] = s.fillna(s.mode(dropna=True).iloc[0])
+        imputed += n
+    report['imputed'] = imputed
+    return arrays, others
+
+
+def find_outliers(arrays, report):
+    # 어느 숫자 열이든 IQR 범위를 벗어나면 그 행은 이상치 (NaN은 이상치로 보지 않음)
+    outside = np.zeros(len(arrays[0]) if arrays else 0, dtype=bool)
+    for v in arrays:
+        q1, q3 = get_quantiles(v, [0.25, 0.75])
+        iqr = q3 - q1
+        with np.errstate(invalid='ignore'):
+            outside |= (v < q1 - IQR_K * iqr) | (v > q3 + IQR_K * iqr)
+    report['outlier_rows'] = int(outside.sum())
+    return ~outside
+
+
+def standardize(v: np.ndarray):
+    # z-score (모표준편차), 값이 모두 같은 열은 0
+    if np.isnan(v).all(): return v
+    std = np.nanstd(v)
+    v -= np.nanmean(v)
+    if std > 0: v /= std
+    return v
+
+
+def normalize(v: np.ndarray):
+    # min-max -> [0, 1], 값이 모두 같은 열은 0
+    if np.isnan(v).all(): return v
+    low, high = np.nanmin(v), np.nanmax(v)
+    v -= low
+    if high > low: v /= high - low
+    return v
+
+
+def is_integral(v: np.ndarray):
+    # NaN을 뺀 값이 모두 정수 (중앙값으로 채운 x.5 등은 정수 dtype으로 되돌리지 않음)
+    v = v[~np.isnan(v)]
+    return bool(np.all(v == np.round(v)))
+
+
+def restore_dtype(v: np.ndarray, dtype):
+    # 스케일링하지 않은 열은 원래 dtype으로 (정수 열은 값이 모두 정수일 때만)
+    if not isinstance(dtype, np.dtype):
+        # pandas 확장 dtype (Int64, UInt8, Float32 등), NaN은 <NA>로
+        if pd.api.types.is_integer_dtype(dtype) and not is_integral(v): return v
+        if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype):
+            return pd.array(v, dtype=dtype)
+        return v
+    if pd.api.types.is_integer_dtype(dtype) and not np.isnan(v).any() and is_integral(v):
+        return v.astype(dtype)
+    if pd.api.types.is_float_dtype(dtype):
+        return v.astype(dtype, copy=False)
+    return v
+
+
+def preprocess(df: pd.DataFrame, columns, options):
+    # (결과 DataFrame, 보고서), 결과에는 선택한 열만 남음
+    columns = [col for col in columns if col in df.columns]
+    options = set(options)
+    numeric = [col for col in columns if is_numeric(df[col])]
+    others = df[[col for col in columns if col not in numeric]].copy()
+    arrays = to_arrays(df, numeric)
+    index = df.index
+    report = {'rows': len(df), 'numeric_columns': numeric}
+
+    if MISSING_VALUES in options:
+        arrays, others = impute(arrays, others, report)
+    if OUTLIERS in options and len(numeric):
+        keep = find_outliers(arrays, report)
+        if not keep.all():
+            arrays, others, index = [v[keep] for v in arrays], others[keep], index[keep]
+    if STANDARDIZATION in options:
+        arrays = [standardize(v) for v in arrays]
+    if NORMALIZATION in options:
+        arrays = [normalize(v) for v in arrays]
+
+    scaled = bool(options & {STANDARDIZATION, NORMALIZATION})
+    result = {col: v if scaled else restore_dtype(v, df[col].dtype) for col, v in zip(numeric, arrays)}
+    for col in others.columns:
+        result[col] = others[col].array
+    out = pd.DataFrame(result, index=index)[columns]
+    report['rows_out'] = len(out)
+    return out, report
+
+
+def make_preprocess_key(digest, columns, options):
+    return digest, tuple(columns), tuple(step for step in STEPS if step in set(options))
+
+
+def run_preprocessing(digest, df: pd.DataFrame, columns, options):
+    # (파일 해시, 열, 옵션)으로 캐시, 옵션을 껐다 켜도 다시 계산하지 않음
+    key = make_preprocess_key(digest, columns, options)
+    result = _results.get(key) if digest is not None else NMemoryCache.MISS
+    if result is NMemoryCache.MISS:
+        result = preprocess(df, columns, key[2])
+        if digest is not None:
+            _results.set(key, result, PREPROCESS_TTL)
+    return result
+
+
+def clear_preprocess_cache():
+    _results.clear()
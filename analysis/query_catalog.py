@@ -0,0 +1,53 @@
+import pandas as pd
+
+PYEONG = 3.3058  # ㎡
+
+
+class NCatalogQuery:
+    # 미리 정의된 질문 -> 크롤링 결과(data_gatherer 열 이름)에 대한 필터/정렬
+    def __init__(self, where=None, sort=None, ascending=True, limit=None, show=[]) -> None:
+        self.where = where  # DataFrame -> bool Series
+        self.sort = sort
+        self.ascending = ascending
+        self.limit = limit
+        self.show = show  # 결과에 함께 보여줄 열
+
+    def run(self, data: pd.DataFrame):
+        df = data if self.where is None else data[self.where(data).fillna(False).astype(bool)]
+        if self.sort is not None:
+            df = df.dropna(subset=[self.sort]).sort_values(self.sort, ascending=self.ascending, kind='mergesort')
+        if self.limit is not None:
+            df = df.head(self.limit)
+        return df
+
+
+def build_year(data: pd.DataFrame):
+    return pd.to_numeric(data['Build'].astype(str).str[:4], errors='coerce')
+
+
+QUERY_CATALOG = {
+    "Find properties priced below 300 million KRW": NCatalogQuery(
+        where=lambda d: d['minDeal'] < 3, sort='minDeal', show=['minDeal']),
+    "Properties with the lowest price per square meter": NCatalogQuery(
+        where=lambda d: d['minDealUnit'].notna(), sort='minDealUnit', limit=10, show=['minDealUnit']),
+    "Recommend properties that are south-facing and have a large area": NCatalogQuery(
+        where=lambda d: d['Dir'].astype(str).str.contains('SS', regex=False), sort='representativeArea',
+        ascending=False, limit=10, show=['Dir']),
+    "List of properties with an area of 20 pyeong or more": NCatalogQuery(
+        where=lambda d: pd.to_numeric(d['representativeArea'], errors='coerce') >= 20 * PYEONG,
+        sort='representativeArea', ascending=False),
+    "Show buildings constructed after 2010": NCatalogQuery(
+        where=lambda d: build_year(d) > 2010, sort='Build', ascending=False, show=['Build']),
+    # 월세, 단지 주차장, 리모델링/관리 상태는 수집하지 않으므로 LLM 사용
+}
+
+
+def find_query(question):
+    return QUERY_CATALOG.get(question.strip()) if question else None
+
+
+def summarize(question, query: NCatalogQuery, result: pd.DataFrame, total: int):
+    text = f"{len(result)} of {total} properties match '{question}'."
+    if len(result) > 0:
+        text += ' Top matches: ' + ', '.join(result['Name'].astype(str).drop_duplicates().head(5)) + '.'
+    return text
@@ -0,0 +1,75 @@
+# 어린이집/유치원 이름 중복 제거: filter_item vs filter_contained_names 비교
+# python -m benchmarks.dedup [항목 수]
+import random
+import sys
+import time
+from gathering_data.classes import *
+from gathering_data.util import filter_item, filter_contained_names
+
+SYLLABLES = ['해', '맑', '은', '꿈', '나', '무', '별', '빛', '숲', '속', '새', '싹', '하', '늘', '반', '디']
+SUFFIXES = ['어린이집', '유치원', '어린이집 분원', '국공립어린이집', '']
+
+
+def make_names(n, rnd: random.Random):
+    bases = [''.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(1, 4))) for _ in range(max(1, n // 3))]
+    names = []
+    for _ in range(n):
+        name = rnd.choice(bases) + rnd.choice(SUFFIXES)
+        if rnd.random() < 0.2:
+            name = rnd.choice(bases) + name
+        names.append(name or rnd.choice(SYLLABLES))
+    return names
+
+
+def make_distinct_names(n, rnd: random.Random):
+    # 서로 포함 관계가 거의 없는 경우 (filter_item의 최악 경우)
+    return [''.join(rnd.choice(SYLLABLES) for _ in range(6)) + '어린이집' for _ in range(n)]
+
+
+def make_neighbors(names):
+    return [NNeighbor(NNeighbor.KID, name, NLocation(37.5, 127.0)) for name in names]
+
+
+def expected(items):
+    return filter_item(items, lambda x: len(x.name), lambda x, y: x.name in y.name and x.name != y.name)
+
+
+def run(n=500, seed=0, distinct=False):
+    rnd = random.Random(seed)
+    items = make_neighbors(make_distinct_names(n, rnd) if distinct else make_names(n, rnd))
+    filter_contained_names(items[:50])  # warm-up
+
+    t = time.perf_counter()
+    old = expected(items)
+    old_time = time.perf_counter() - t
+
+    t = time.perf_counter()
+    new = filter_contained_names(items)
+    new_time = time.perf_counter() - t
+
+    return {
+        'items': n,
+        'distinct': distinct,
+        'kept': len(new),
+        'filter_item_s': old_time,
+        'filter_contained_names_s': new_time,
+        'match': [id(x) for x in old] == [id(x) for x in new],
+    }
+
+
+def check(seeds=200):
+    # 작은 입력에서 기존 구현과 결과(순서 포함)가 같은지 확인
+    for seed in range(seeds):
+        rnd = random.Random(seed)
+        items = make_neighbors(make_names(rnd.randint(0, 40), rnd))
+        if rnd.random() < 0.05:
+            items.append(NNeighbor(NNeighbor.KID, '', NLocation(37.5, 127.0)))
+        assert [id(x) for x in expected(items)] == [id(x) for x in filter_contained_names(items)], seed
+    return True
+
+
+if __name__ == "__main__":
+    print('regression', check())
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(run(n))
+    print(run(n, distinct=True))
@@ -0,0 +1,161 @@
+# 벤치마크용 Naver 응답 (CORTARS, COMPLEX2 방향별, 편의시설 종류별, 학교)
+# 기록: python -m benchmarks.fixtures record gangnam 37.4979462 127.0276206
+# benchmarks/fixtures/<이름>.json.gz 가 있으면 기록된 응답을, 없으면 같은 모양의 합성 응답을 사용
+import gzip
+import json
+import math
+import os
+import random
+import sys
+from gathering_data.classes import *
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 이름 -> (중심 좌표, 단지 수, 종류별 편의시설 수, 학교 수, 경계 꼭짓점 수)
+FIXTURE_SIZES = {
+    'small': ((37.5665, 126.9780), 40, 20, 6, 40),  # 작은 동
+    'medium': ((37.5172, 127.0473), 160, 80, 20, 120),
+    'gangnam': ((37.4979462, 127.0276206), 700, 300, 60, 400),  # 강남역 주변 밀집 섹터
+}
+SECTOR_RADIUS = 0.012  # 경계 반지름 (도)
+DIRECTION_SHARE = 0.35  # 단지가 방향 하나의 응답에 포함될 확률
+
+KID_NAMES = ['해맑은', '꿈나무', '별빛', '새싹', '하늘', '숲속', '반디', '무지개']
+
+
+def make_sector_json(center, n_vertex, rnd: random.Random, no='1168010100'):
+    vertexs = []
+    for i in range(n_vertex):
+        angle = 2 * math.pi * i / n_vertex
+        r = SECTOR_RADIUS * (0.8 + 0.2 * rnd.random())
+        vertexs.append([center[0] + r * math.sin(angle), center[1] + r * 1.25 * math.cos(angle)])
+    return {'sectorName': '역삼동', 'centerLat': center[0], 'centerLon': center[1], 'sectorNo': no,
+            'cityName': '서울시', 'divisionName': '강남구', 'cortarVertexLists': [vertexs]}
+
+
+def random_around(center, rnd: random.Random, spread=1.3):
+    return (center[0] + (rnd.random() * 2 - 1) * SECTOR_RADIUS * spread,
+            center[1] + (rnd.random() * 2 - 1) * SECTOR_RADIUS * 1.25 * spread)
+
+
+def make_complex_pool(center, n, rnd: random.Random):
+    # 섹터 안팎의 단지 (방향별 응답은 이 중 일부를 같은 markerId/좌표로 반환)
+    pool = []
+    for i in range(n):
+        lat, lon = random_around(center, rnd)
+        area = rnd.choice([39, 49, 59, 74, 84, 102, 114, 135])
+        pool.append({'markerId': str(100000 + i), 'complexName': f'단지{i}', 'markerType': 'COMPLEX',
+                     'realEstateTypeCode': rnd.choice([NAddon.ESTATE_APT, NAddon.ESTATE_APT, NAddon.ESTATE_OPST]),
+                     'completionYearMonth': '%d%02d' % (rnd.randint(1980, 2023), rnd.randint(1, 12)),
+                     'latitude': lat, 'longitude': lon, 'representativeArea': area,
+                     'floorAreaRatio': rnd.randint(150, 350), 'price': rnd.randint(30, 400) * 1000})
+    return pool
+
+
+def make_complexes_json(pool, dir, rnd: random.Random, share=DIRECTION_SHARE):
+    results = []
+    for base in pool:
+        if rnd.random() >= share: continue
+        area = base['representativeArea']
+        deal = int(base['price'] * rnd.uniform(0.9, 1.1))
+        lease = int(deal * rnd.uniform(0.4, 0.7))
+        v = {k: base[k] for k in ('markerId', 'complexName', 'markerType', 'realEstateTypeCode',
+                                  'completionYearMonth', 'latitude', 'longitude', 'representativeArea',
+                                  'floorAreaRatio')}
+        v.update({'minArea': str(area - rnd.choice([0, 10, 20])), 'maxArea': str(area + rnd.choice([0, 25, 50])),
+                  'dealCount': rnd.randint(0, 5), 'leaseCount': rnd.randint(0, 5), 'rentCount': 0,
+                  'directions': dir})
+        if rnd.random() < 0.9:
+            v.update({'minDealPrice': deal, 'maxDealPrice': int(deal * 1.3), 'medianDealPrice': int(deal * 1.1),
+                      'minDealUnitPrice': deal // area, 'maxDealUnitPrice': int(deal * 1.3) // area,
+                      'medianDealUnitPrice': int(deal * 1.1) // area})
+        if rnd.random() < 0.8:
+            v.update({'minLeasePrice': lease, 'maxLeasePrice': int(lease * 1.2),
+                      'medianLeasePrice': int(lease * 1.1), 'minLeaseUnitPrice': lease // area,
+                      'maxLeaseUnitPrice': int(lease * 1.2) // area, 'medianLeaseUnitPrice': int(lease * 1.1) // area})
+        results.append(v)
+    return results
+
+
+def make_neighborhoods_json(center, n, nType, rnd: random.Random):
+    items = []
+    for i in range(n):
+        lat, lon = random_around(center, rnd)
+        name = f'{nType}{i}'
+        if nType == NNeighbor.KID or nType == NNeighbor.PRESCHOOL:
+            # 본원/분원처럼 서로 포함하는 이름
+            name = rnd.choice(KID_NAMES) + str(i // 3) + rnd.choice(['어린이집', '유치원', '어린이집 분원'])
+        items.append({'name': name, 'latitude': lat, 'longitude': lon})
+    return {'neighborhoods': items}
+
+
+def make_schools_json(center, n, rnd: random.Random):
+    results = []
+    for i in range(n):
+        lat, lon = random_around(center, rnd)
+        results.append({'schoolName': f'학교{i}', 'organizationType': rnd.choice(['공립', '공립', '사립']),
+                        'latitude': lat, 'longitude': lon})
+    return results
+
+
+def make_fixture(name='medium', seed=0):
+    center, n_complex, n_neighbor, n_school, n_vertex = FIXTURE_SIZES[name]
+    rnd = random.Random(seed)
+    neighborhoods = {nType: make_neighborhoods_json(center, n_neighbor, nType, rnd)
+                     for nType in NNeighbor.EACH if nType != NNeighbor.SCHOOL}
+    pool = make_complex_pool(center, n_complex, rnd)
+    return {
+        'name': name,
+        'source': 'synthetic',
+        'cortars': make_sector_json(center, n_vertex, rnd, '11680%03d00' % (101 + list(FIXTURE_SIZES).index(name))),
+        'complexes': {dir: make_complexes_json(pool, dir, rnd) for dir in NAddon.DIR_EACH},
+        'neighborhoods': neighborhoods,
+        'schools': make_schools_json(center, n_school, rnd),
+    }
+
+
+def get_fixture_path(name):
+    return os.path.join(FIXTURE_PATH, f'{name}.json.gz')
+
+
+def load_fixture(name, seed=0):
+    path = get_fixture_path(name)
+    if os.path.exists(path):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    return make_fixture(name, seed)
+
+
+def list_fixtures():
+    recorded = [f[:-len('.json.gz')] for f in os.listdir(FIXTURE_PATH) if f.endswith('.json.gz')] \
+        if os.path.isdir(FIXTURE_PATH) else []
+    return list(FIXTURE_SIZES.keys()) + sorted(set(recorded) - set(FIXTURE_SIZES.keys()))
+
+
+def record_fixture(name, loc: NLocation, addon: NAddon = None):
+    # 실제 API 응답을 그대로 저장 (캐시는 쓰지 않음)
+    from gathering_data import util
+    sector_json = util.fetch(NRE_ROUTER.CORTARS, util.make_param_sector(loc))
+    sector = util.parse_sector(sector_json)
+    fixture = {'name': name, 'source': 'recorded', 'cortars': sector_json, 'complexes': {}, 'neighborhoods': {}}
+    for a in util.make_addon_each_direction(addon):
+        fixture['complexes'][NAddon.preprocess(a.dir)] = util.fetch(NRE_ROUTER.COMPLEX2,
+                                                                      util.make_param_thing(sector, a))
+    for nType in NNeighbor.EACH:
+        res = util.fetch(util.get_neighborhood_route(nType), util.make_param_neighborhood(sector, nType))
+        if nType == NNeighbor.SCHOOL:
+            fixture['schools'] = res
+        else:
+            fixture['neighborhoods'][nType] = res
+
+    os.makedirs(FIXTURE_PATH, exist_ok=True)
+    with gzip.open(get_fixture_path(name), 'wt', encoding='utf-8') as f:
+        json.dump(fixture, f, ensure_ascii=False)
+    return get_fixture_path(name)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 5 or sys.argv[1] != 'record':
+        print('usage: python -m benchmarks.fixtures record <이름> <위도> <경도>')
+        sys.exit(2)
+    print(record_fixture(sys.argv[2], NLocation(float(sys.argv[3]), float(sys.argv[4]))))
@@ -0,0 +1,49 @@
+# 모듈 import 시간 / 무거운 의존성 로드 여부 확인 (-X importtime, 새 프로세스에서 측정)
+# python -m benchmarks.import_time
+import os
+import subprocess
+import sys
+
+# 모듈 -> 허용 시간 (ms, 누적)
+IMPORT_BUDGET = {
+    'gathering_data.classes': 400,
+    'gathering_data.util': 600,
+    'gathering_data.data_gatherer': 800,
+}
+# 처음 사용할 때까지 import 되면 안 되는 모듈
+LAZY_MODULES = ['cv2', 'shapely', 'openai', 'aiohttp', 'duckdb', 'pandasai', 'haversine', 'streamlit',
+                'requests', 'pandas']
+REPEAT = 3
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module):
+    # (누적 시간 ms, import 된 최상위 모듈 목록)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True, cwd=PROJECT_ROOT)
+    total, loaded = 0.0, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line: continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        loaded.add(name.split('.')[0])
+        if name == module:
+            total = int(cumulative) / 1000
+    return total, loaded
+
+
+def main():
+    failed = False
+    for module, budget in IMPORT_BUDGET.items():
+        runs = [measure(module) for _ in range(REPEAT)]
+        total = min(t for t, _ in runs)
+        heavy = sorted(set(LAZY_MODULES) & runs[0][1])
+        ok = total <= budget and not heavy
+        failed |= not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {module:32s} {total:8.1f} ms (budget {budget} ms)"
+              + (f"  eager: {', '.join(heavy)}" if heavy else ''))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
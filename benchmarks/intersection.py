@@ -0,0 +1,61 @@
+# 편의시설 교차 집계: 기존 이중 루프 vs 벡터화 구현 비교
+# python -m benchmarks.intersection [매물 수] [편의시설 수]
+import random
+import sys
+import time
+from gathering_data.classes import *
+from gathering_data.util import distance_between, get_distance_standard, update_things_intersection
+
+
+def update_things_intersection_loop(things: list[NThing], neighbors: list[NNeighbor], standard):
+    # 벡터화 이전 구현 (비교 기준)
+    for thing in things:  # 매물
+        around = NNeighborAround()
+        for nei in neighbors:  # 편의시설
+            d = distance_between(thing.loc, nei.loc)
+            if d <= standard[nei.type]:  # meter
+                around.increase(nei.type)
+        thing.neiAround = around
+
+
+def make_things(n, rnd: random.Random):
+    return [NThing('T%d' % i, NAddon.ESTATE_APT, '201001',
+                   NLocation(37.49 + rnd.random() * 0.02, 127.02 + rnd.random() * 0.02),
+                   NArea(59, 84, 84, 200), NPrice(0, 0, 0), NPrice(0, 0, 0), NPrice(0, 0, 0), NPrice(0, 0, 0))
+            for i in range(n)]
+
+
+def make_neighbors(n, rnd: random.Random):
+    return [NNeighbor(rnd.choice(NNeighborAround.HEADER), 'N%d' % i,
+                      NLocation(37.48 + rnd.random() * 0.04, 127.01 + rnd.random() * 0.04))
+            for i in range(n)]
+
+
+def run(n_things=300, n_neighbors=3000, seed=0):
+    rnd = random.Random(seed)
+    things, neighbors = make_things(n_things, rnd), make_neighbors(n_neighbors, rnd)
+    standard = get_distance_standard()
+
+    t = time.perf_counter()
+    update_things_intersection_loop(things, neighbors, standard)
+    loop_time = time.perf_counter() - t
+    expected = [list(th.neiAround.get_list()) for th in things]
+
+    t = time.perf_counter()
+    update_things_intersection(things, neighbors, standard)
+    vector_time = time.perf_counter() - t
+    actual = [list(th.neiAround.get_list()) for th in things]
+
+    return {
+        'things': n_things,
+        'neighbors': n_neighbors,
+        'loop_s': loop_time,
+        'vectorized_s': vector_time,
+        'speedup': loop_time / vector_time if vector_time > 0 else None,
+        'match': expected == actual,
+    }
+
+
+if __name__ == "__main__":
+    args = [int(v) for v in sys.argv[1:3]]
+    print(run(*args))
@@ -0,0 +1,117 @@
+# NaverRECrawler.search_location 전체 과정을 로컬 대역 서버(benchmarks.naver_stub)에 대해 N명이 동시에 실행
+# python -m benchmarks.load_test [--users 8] [--searches 3] [--fixture medium] [--rate 10]
+#                                [--latency 0.05] [--error-rate 0.01] [--rate-limit 20] [--cache] [--sync]
+#                                [--url http://127.0.0.1:8765] [--out load.json] [--metrics load.prom]
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from gathering_data import geocode, util
+from gathering_data.cache import configure_cache
+from gathering_data.metrics import get_metrics, write_prometheus
+from gathering_data.scheduler import REQUEST_RATE, configure_scheduler
+from gathering_data.data_gatherer import NaverRECrawler
+from benchmarks.fixtures import load_fixture
+from benchmarks.naver_stub import API_PREFIX, GEOCODE_PATH, NNaverStub
+
+QUERIES = ['강남역', '역삼역', '선릉역', 'Gangnam Station', '삼성역', '교대역']
+
+
+def percentiles(values):
+    if len(values) == 0: return {}
+    p = np.percentile(np.asarray(values) * 1000, [50, 95, 99])
+    return {'p50_ms': round(float(p[0]), 1), 'p95_ms': round(float(p[1]), 1), 'p99_ms': round(float(p[2]), 1),
+            'mean_ms': round(float(np.mean(values) * 1000), 1), 'max_ms': round(float(np.max(values) * 1000), 1)}
+
+
+def run_users(users, searches, concurrent=True):
+    # 사용자마다 크롤러 하나, 검색을 차례로 searches번
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def user(i):
+        crawler = NaverRECrawler(concurrent)
+        for j in range(searches):
+            start = time.perf_counter()
+            try:
+                crawler.search_location(QUERIES[(i + j) % len(QUERIES)])
+                with lock: latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                with lock: errors.append(str(e))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(user, range(users)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='대역 서버에 대한 동시 사용자 부하 시험')
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--searches', type=int, default=3, help='사용자당 검색 수')
+    parser.add_argument('--fixture', default='medium')
+    parser.add_argument('--rate', type=float, default=REQUEST_RATE, help='클라이언트 스케줄러 초당 요청 수')
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=None, help='서버 초당 허용 요청 수 (넘으면 429)')
+    parser.add_argument('--cache', action='store_true', help='Naver 응답 캐시 사용 (빈 임시 캐시에서 시작)')
+    parser.add_argument('--sync', action='store_true', help='섹터 내 요청을 순차로 실행')
+    parser.add_argument('--url', help='이미 실행 중인 대역 서버 주소 (예: http://127.0.0.1:8765)')
+    parser.add_argument('--out', help='결과 JSON 경로 (기본: 표준 출력)')
+    parser.add_argument('--metrics', help='Prometheus 텍스트 형식으로 지표 저장')
+    args = parser.parse_args(argv)
+
+    stub = None
+    if args.url:
+        util.BASE_API_URL = args.url.rstrip('/') + API_PREFIX
+        geocode.GEOCODE_API_URL = args.url.rstrip('/') + GEOCODE_PATH
+    else:
+        stub = NNaverStub(load_fixture(args.fixture), args.latency, args.jitter, args.error_rate,
+                          args.rate_limit).start()
+        util.BASE_API_URL, geocode.GEOCODE_API_URL = stub.api_url, stub.geocode_url
+    os.environ.setdefault('GOOGLE_API_KEY', 'stub')
+    util.IS_LOGGING = False
+    util.IS_CACHING = args.cache
+    scheduler = configure_scheduler(args.rate)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_cache(os.path.join(tmp, 'cache.sqlite3'))
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies, errors, elapsed = run_users(args.users, args.searches, not args.sync)
+        configure_cache()
+    if stub is not None:
+        stub.stop()
+
+    report = {
+        'config': {k: v for k, v in vars(args).items() if k not in ('out', 'metrics')},
+        'searches': len(latencies) + len(errors),
+        'errors': len(errors),
+        'error_samples': sorted(set(errors))[:5],
+        'elapsed_s': round(elapsed, 3),
+        'searches_per_s': round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+        'latency': percentiles(latencies),
+        'scheduler': scheduler.get_stats(),
+        'server': stub.get_stats() if stub is not None else None,
+        'metrics': get_metrics().get_summary(),
+    }
+    if args.metrics:
+        write_prometheus(args.metrics)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
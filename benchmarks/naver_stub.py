@@ -0,0 +1,181 @@
+# new.land.naver.com/api/ (NRE_ROUTER 경로)와 Google geocode를 흉내 내는 로컬 서버
+# python -m benchmarks.naver_stub [--fixture gangnam] [--port 8765] [--latency 0.05] [--error-rate 0.01]
+#                                 [--rate-limit 20]
+# 응답은 benchmarks.fixtures (기록된 응답 또는 합성 응답)
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from gathering_data.classes import *
+from benchmarks.fixtures import load_fixture
+
+API_PREFIX = '/api/'
+GEOCODE_PATH = '/maps/api/geocode/json'
+
+
+class NNaverStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        status, body, headers = self.server.stub.handle(url.path, parse_qs(url.query))
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class NNaverStub:
+    def __init__(self, fixture=None, latency=0.05, jitter=0.02, error_rate=0.0, rate_limit=None, burst=None,
+                 seed=0, host='127.0.0.1', port=0) -> None:
+        self.fixture = load_fixture('medium') if fixture is None else fixture
+        self.latency = latency  # 초 (평균)
+        self.jitter = jitter
+        self.error_rate = error_rate  # 500 응답 비율
+        self.rate_limit = rate_limit  # 초당 요청 수, 넘으면 429
+        self.burst = rate_limit if burst is None else burst
+        self.host, self.port = host, port
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._server = None
+        self.counts = {'requests': 0, 'ok': 0, 'errors': 0, 'throttled': 0}
+        self.routes = {}  # 경로별 요청 수
+
+        center = self.fixture['cortars']
+        self.center = (center['centerLat'], center['centerLon'])
+        self.all_complexes = [v for res in self.fixture['complexes'].values() for v in res]
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), NNaverStubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self.port = self._server.server_port
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def api_url(self):
+        return f'http://{self.host}:{self.port}{API_PREFIX}'
+
+    @property
+    def geocode_url(self):
+        return f'http://{self.host}:{self.port}{GEOCODE_PATH}'
+
+    def _take_token(self):
+        if self.rate_limit is None: return True
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_limit)
+        self._updated = now
+        if self._tokens < 1: return False
+        self._tokens -= 1
+        return True
+
+    def handle(self, path, query):
+        # (status, body, headers)
+        with self._lock:
+            self.counts['requests'] += 1
+            self.routes[path] = self.routes.get(path, 0) + 1
+            allowed = self._take_token()
+            failed = self._rnd.random() < self.error_rate
+            delay = max(0.0, self._rnd.gauss(self.latency, self.jitter)) if self.latency > 0 else 0.0
+            if not allowed:
+                self.counts['throttled'] += 1
+            elif failed:
+                self.counts['errors'] += 1
+            else:
+                self.counts['ok'] += 1
+
+        if not allowed:
+            return 429, {'error': 'Too Many Requests'}, {'Retry-After': '1'}
+        time.sleep(delay)
+        if failed:
+            return 500, {'error': 'Internal Server Error'}, {}
+        body = self.route(path, {k: v[0] for k, v in query.items()})
+        if body is None:
+            return 404, {'error': 'Not Found'}, {}
+        return 200, body, {}
+
+    def route(self, path, query):
+        if path == GEOCODE_PATH:
+            if not query.get('address'):
+                return {'status': 'ZERO_RESULTS', 'results': []}
+            return {'status': 'OK', 'results': [{'geometry': {'location': {'lat': self.center[0],
+                                                                           'lng': self.center[1]}}}]}
+        if not path.startswith(API_PREFIX):
+            return None
+        route = path[len(API_PREFIX):]
+        if route == NRE_ROUTER.CORTARS:
+            return self.fixture['cortars']
+        if route == NRE_ROUTER.COMPLEX2:
+            return self.fixture['complexes'].get(query.get('directions', ''), self.all_complexes)
+        if route == NRE_ROUTER.NEIGHBORHOOD:
+            return self.fixture['neighborhoods'].get(query.get('type', ''), {'neighborhoods': []})
+        if route == NRE_ROUTER.SCHOOL:
+            return self.fixture['schools']
+        if route == NRE_ROUTER.REGION_LIST:
+            return self.get_region_list(query.get('cortarNo', '0000000000'))
+        return None
+
+    def get_region_list(self, code):
+        # 시도 2개 -> 시군구 2개 -> 읍면동 3개
+        if code == '0000000000':
+            children = ['1100000000', '4100000000']
+        elif code[2:] == '00000000':
+            children = [code[:2] + '%03d' % n + '00000' for n in (110, 680)]
+        elif code[5:] == '00000':
+            children = [code[:5] + '%03d' % (101 + i) + '00' for i in range(3)]
+        else:
+            children = []
+        return {'regionList': [{'cortarName': 'r' + no, 'centerLat': self.center[0], 'centerLon': self.center[1],
+                                'cortarNo': no} for no in children]}
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.counts)
+            stats['routes'] = dict(self.routes)
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Naver 부동산 API 로컬 대역 서버')
+    parser.add_argument('--fixture', default='medium')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=None)
+    args = parser.parse_args(argv)
+
+    stub = NNaverStub(load_fixture(args.fixture), args.latency, args.jitter, args.error_rate, args.rate_limit,
+                      host=args.host, port=args.port).start()
+    print(f'NRE_BASE_API_URL={stub.api_url}')
+    print(f'NRE_GEOCODE_URL={stub.geocode_url}')
+    try:
+        while True:
+            time.sleep(10)
+            print(stub.get_stats())
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# 섹터 처리 단계별 시간 측정 (네트워크 없이 benchmarks.fixtures 응답을 재생)
+# python -m benchmarks.stages [--fixtures small medium gangnam] [--repeat 5] [--out stages.json]
+#                             [--baseline old.json --tolerance 1.5]
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+import numpy as np
+from gathering_data.classes import *
+from gathering_data.util import encode_image, filter_contained_names, get_distance_standard, parse_neighbor, \
+    parse_sector, parse_things, render_sector, update_things_intersection
+from gathering_data.data_gatherer import to_real_estate_dataframe
+from gathering_data.heatmap import aggregate_grid
+from benchmarks.fixtures import FIXTURE_SIZES, load_fixture
+
+STAGES = ['parse_sector', 'contain', 'parse_things', 'merge', 'parse_neighbor', 'dedup', 'intersection',
+          'dataframe', 'heatmap', 'render', 'png']
+# 이보다 짧은 단계는 측정 오차가 커서 비교하지 않음
+MIN_COMPARE_MS = 1.0
+
+
+def timeit(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'min_ms': round(min(times), 3), 'median_ms': round(statistics.median(times), 3),
+            'max_ms': round(max(times), 3)}
+
+
+def parse_all_things(fixture, sector):
+    return NThingFrame.concat([parse_things(res, sector, dir) for dir, res in fixture['complexes'].items()])
+
+
+def parse_all_neighbors(fixture):
+    neighbors = []
+    for nType, res in fixture['neighborhoods'].items():
+        neighbors.extend(parse_neighbor(res, nType))
+    neighbors.extend(parse_neighbor(fixture['schools'], NNeighbor.SCHOOL))
+    return neighbors
+
+
+def run_fixture(fixture, repeat):
+    # 각 단계는 앞 단계 결과를 입력으로 받되 시간은 단계별로 따로 측정
+    sector = parse_sector(fixture['cortars'])
+    complexes = [v for res in fixture['complexes'].values() for v in res]
+    lats = np.array([float(v['latitude']) for v in complexes])
+    lons = np.array([float(v['longitude']) for v in complexes])
+    per_direction = parse_all_things(fixture, sector)
+    things = per_direction.merge_directions()
+    neighbors = parse_all_neighbors(fixture)
+    kids = [NNeighbor(nType, v['name'], NLocation(v['latitude'], v['longitude']))
+            for nType in (NNeighbor.KID, NNeighbor.PRESCHOOL)
+            for v in fixture['neighborhoods'].get(nType, {}).get('neighborhoods', [])]
+    standard = get_distance_standard()
+
+    cases = {
+        'parse_sector': (lambda: parse_sector(fixture['cortars']), 1),
+        'contain': (lambda: sector.map.contains_many(lats, lons), len(complexes)),
+        'parse_things': (lambda: parse_all_things(fixture, sector), len(complexes)),
+        'merge': (lambda: per_direction.merge_directions(), len(per_direction)),
+        'parse_neighbor': (lambda: parse_all_neighbors(fixture), len(neighbors)),
+        'dedup': (lambda: filter_contained_names(kids), len(kids)),
+        'intersection': (lambda: update_things_intersection(things, neighbors, standard), len(things)),
+        'dataframe': (lambda: to_real_estate_dataframe(things), len(things)),
+        'heatmap': (lambda: aggregate_grid(things.columns['Lat'], things.columns['Lon'],
+                                           things.columns['medianDealUnit'], 4), len(things)),
+        'render': (lambda: render_sector(sector, things, neighbors), len(things) + len(neighbors)),
+        'png': (lambda: encode_image(render_sector(sector, things, neighbors)), len(things) + len(neighbors)),
+    }
+    results = []
+    for stage in STAGES:
+        fn, items = cases[stage]
+        fn()  # warm-up
+        result = {'fixture': fixture['name'], 'source': fixture.get('source', 'recorded'), 'stage': stage,
+                  'items': items}
+        result.update(timeit(fn, repeat))
+        results.append(result)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # 기준 결과보다 tolerance 배 이상 느려진 단계
+    old = {(r['fixture'], r['stage']): r['median_ms'] for r in baseline['results']}
+    slower = []
+    for r in results:
+        before = old.get((r['fixture'], r['stage']))
+        if before is None or before < MIN_COMPARE_MS: continue
+        r['baseline_ms'] = before
+        r['ratio'] = round(r['median_ms'] / before, 3)
+        if r['ratio'] > tolerance:
+            slower.append(r)
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='섹터 처리 단계별 벤치마크 (오프라인)')
+    parser.add_argument('--fixtures', nargs='+', default=list(FIXTURE_SIZES.keys()))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='결과 JSON 경로 (기본: 표준 출력)')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.fixtures:
+        results.extend(run_fixture(load_fixture(name, args.seed), args.repeat))
+
+    report = {
+        'meta': {'created': datetime.datetime.now().isoformat(timespec='seconds'),
+                 'python': platform.python_version(), 'numpy': np.__version__,
+                 'machine': platform.machine(), 'repeat': args.repeat, 'seed': args.seed},
+        'results': results,
+    }
+    slower = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            slower = compare(results, json.load(f), args.tolerance)
+        report['regressions'] = [(r['fixture'], r['stage'], r['ratio']) for r in slower]
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    for r in results:
+        print(f"{r['fixture']:10s} {r['stage']:16s} {r['items']:7d} items {r['median_ms']:10.3f} ms"
+              + (f"  x{r['ratio']}" if 'ratio' in r else ''), file=sys.stderr)
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import time
+import aiohttp
+from gathering_data.classes import *
+from gathering_data import util
+from gathering_data.scheduler import get_scheduler
+from gathering_data.cache import NSQLiteCache, ROUTE_TTL, get_cache, make_cache_key
+from gathering_data.metrics import get_metrics
+
+# 동시 요청 수 제한
+CONCURRENCY = 8
+
+
+def to_query(params: dict):
+    # aiohttp는 bool/None 값을 받지 않으므로 requests와 동일한 문자열로 변환
+    return {k: str(v) for k, v in params.items() if v is not None}
+
+
+def make_timeout(timeout=None):
+    connect, read = util.REQUEST_TIMEOUT if timeout is None else timeout
+    return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+
+async def get_async(session: aiohttp.ClientSession, sem: asyncio.Semaphore, url="", params={}, timeout=None,
+                    use_cache=True):
+    start = time.perf_counter()
+    ttl = ROUTE_TTL.get(url) if util.IS_CACHING is True else None
+    if ttl is None:
+        res, cache = await fetch_async(session, sem, url, params, timeout), 'off'
+    elif not use_cache:
+        res, cache = await fetch_async(session, sem, url, params, timeout), 'bypass'
+        get_cache().set(url, make_cache_key(url, params), res, ttl)
+    else:
+        key = make_cache_key(url, params)
+        res = get_cache().get(url, key)
+        cache = 'miss' if res is NSQLiteCache.MISS else 'hit'
+        if res is NSQLiteCache.MISS:
+            res = await fetch_async(session, sem, url, params, timeout)
+            get_cache().set(url, key, res, ttl)
+    util.record_request(url, cache, time.perf_counter() - start)
+    return res
+
+
+async def fetch_async(session: aiohttp.ClientSession, sem: asyncio.Semaphore, url="", params={}, timeout=None):
+    scheduler = get_scheduler()
+    client_timeout = make_timeout(timeout)
+    for attempt in range(util.RETRY_TOTAL + 1):
+        last = attempt == util.RETRY_TOTAL
+        async with sem:
+            await scheduler.acquire_async(url)
+            start = time.perf_counter()
+            try:
+                async with session.get(util.BASE_API_URL + url, params=to_query(params),
+                                       timeout=client_timeout) as rep:
+                    if util.IS_LOGGING is True: print('Get', rep.url)
+                    body = await rep.read()
+                    util.record_response(url, rep.status, len(body), time.perf_counter() - start)
+                    throttled = rep.status in util.RETRY_STATUS
+                    scheduler.record(url, not throttled, rep.headers.get('Retry-After') if throttled else None)
+                    if throttled and not last: continue
+                    if rep.status != 200: raise Exception('Response Error')
+                    return json.loads(body)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                scheduler.record(url, False)
+                get_metrics().increase('request_errors', route=url, reason=type(e).__name__)
+                if last: raise
+
+
+async def get_neighborhood_async(session, sem, sector: NSector, nType=''):
+    res = await get_async(session, sem, util.get_neighborhood_route(nType),
+                          util.make_param_neighborhood(sector, nType))
+    return util.parse_neighbor(res, nType)
+
+
+async def get_things_async(session, sem, sector: NSector, addon=NAddon.get_default(), use_cache=True):
+    res = await get_async(session, sem, NRE_ROUTER.COMPLEX2, util.make_param_thing(sector, addon),
+                          use_cache=use_cache)
+    return util.parse_things(res, sector, addon.dir)
+
+
+async def get_things_each_direction_async(session, sem, sector: NSector, addon: NAddon = None, use_cache=True):
+    results = await asyncio.gather(*[get_things_async(session, sem, sector, a, use_cache)
+                                     for a in util.make_addon_each_direction(addon)])
+    # 매물 기록 (여러 방향에 걸친 단지는 한 행으로)
+    return util.merge_directions(NThingFrame.concat(results))
+
+
+async def get_all_neighbors_async(session, sem, sector: NSector):
+    results = await asyncio.gather(*[get_neighborhood_async(session, sem, sector, nType)
+                                     for nType in NNeighbor.EACH])
+    neighbors = []  # 편의시설 기록
+    for res in results:
+        neighbors.extend(res)
+    return neighbors
+
+
+async def get_all_on_sector_async(sector: NSector, concurrency: int = CONCURRENCY, addon: NAddon = None,
+                                  use_cache=True):
+    sem = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=util.POOL_SIZE)
+    async with aiohttp.ClientSession(connector=connector, headers={'User-Agent': '*'}) as session:
+        things, neighbors = await asyncio.gather(
+            get_things_each_direction_async(session, sem, sector, addon, use_cache),
+            get_all_neighbors_async(session, sem, sector)
+        )
+    return (sector, things, neighbors)
+
+
+def run_all_on_sector(sector: NSector, concurrency: int = CONCURRENCY, addon: NAddon = None, use_cache=True):
+    # 동기 코드(streamlit 등)에서 호출하기 위한 진입점
+    return asyncio.run(get_all_on_sector_async(sector, concurrency, addon, use_cache))
@@ -0,0 +1,258 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future
+from gathering_data.classes import NRE_ROUTER
+
+CACHE_PATH = os.environ.get('NRE_CACHE_PATH',
+                            os.path.join(os.path.expanduser('~'), '.cache', 'korea-estate-query', 'cache.sqlite3'))
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+DAY = 24 * 60 * 60
+# 경로별 유효 기간 (초), 없는 경로는 캐시하지 않음
+ROUTE_TTL = {
+    NRE_ROUTER.REGION_LIST: 30 * DAY,
+    NRE_ROUTER.CORTARS: 30 * DAY,
+    NRE_ROUTER.SCHOOL: 30 * DAY,
+    NRE_ROUTER.NEIGHBORHOOD: 7 * DAY,
+    NRE_ROUTER.COMPLEX2: 1 * DAY,
+}
+
+
+class NSQLiteCache:
+    MISS = object()
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES) -> None:
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS cache (
+            ns TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            expires REAL NOT NULL,
+            accessed REAL NOT NULL,
+            PRIMARY KEY (ns, key))''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)')
+        self.size = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+
+    def get(self, ns, key, default=MISS):
+        entry = self.get_entry(ns, key)
+        return default if entry is NSQLiteCache.MISS else entry[0]
+
+    def get_entry(self, ns, key):
+        # (value, expires) 또는 MISS
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT value, expires FROM cache WHERE ns = ? AND key = ?',
+                                     (ns, key)).fetchone()
+            if row is None or row[1] < now:
+                self.misses[ns] = self.misses.get(ns, 0) + 1
+                return NSQLiteCache.MISS
+            self._conn.execute('UPDATE cache SET accessed = ? WHERE ns = ? AND key = ?', (now, ns, key))
+            self.hits[ns] = self.hits.get(ns, 0) + 1
+        return json.loads(zlib.decompress(row[0])), row[1]
+
+    def set(self, ns, key, value, ttl):
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM cache WHERE ns = ? AND key = ?', (ns, key)).fetchone()
+            self._conn.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)',
+                               (ns, key, blob, len(blob), now + ttl, now))
+            self.size += len(blob) - (old[0] if old else 0)
+            if self.size > self.max_bytes:
+                self._evict(now)
+
+    def _evict(self, now):
+        # 만료된 항목 먼저, 그래도 크면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+        self._conn.execute('DELETE FROM cache WHERE expires < ?', (now,))
+        self.size = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+        if self.size <= self.max_bytes: return
+        freed = 0
+        stale = []
+        for ns, key, size in self._conn.execute('SELECT ns, key, size FROM cache ORDER BY accessed'):
+            stale.append((ns, key))
+            freed += size
+            if self.size - freed <= self.max_bytes: break
+        self._conn.executemany('DELETE FROM cache WHERE ns = ? AND key = ?', stale)
+        self.size -= freed
+
+    def get_all(self, ns):
+        # 만료되지 않은 항목 전체 {key: value} (hit/miss 집계와 LRU 순서에는 반영하지 않음)
+        with self._lock:
+            rows = self._conn.execute('SELECT key, value FROM cache WHERE ns = ? AND expires >= ?',
+                                      (ns, time.time())).fetchall()
+        return {key: json.loads(zlib.decompress(value)) for key, value in rows}
+
+    def delete(self, ns, key):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache WHERE ns = ? AND key = ?', (ns, key))
+            self.size = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+
+    def clear(self, ns=None):
+        with self._lock:
+            if ns is None:
+                self._conn.execute('DELETE FROM cache')
+            else:
+                self._conn.execute('DELETE FROM cache WHERE ns = ?', (ns,))
+            self.size = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'hits': dict(self.hits),
+                'misses': dict(self.misses),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+            }
+
+
+class NMemoryCache:
+    # 프로세스 내 LRU (유효 기간 포함)
+    MISS = NSQLiteCache.MISS
+
+    def __init__(self, max_entries=1024) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # key -> (value, expires)
+        self._lock = threading.Lock()
+
+    def get_entry(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or entry[1] < time.time():
+                if entry is not None: del self._items[key]
+                self.misses += 1
+                return NMemoryCache.MISS
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def get(self, key, default=MISS):
+        entry = self.get_entry(key)
+        return default if entry is NMemoryCache.MISS else entry[0]
+
+    def set(self, key, value, ttl, expires=None):
+        with self._lock:
+            self._items[key] = (value, time.time() + ttl if expires is None else expires)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._items),
+                    'max_entries': self.max_entries}
+
+
+class NTieredCache:
+    # 메모리 LRU -> SQLite 순으로 조회, 디스크 적중 시 메모리로 올림
+    MISS = NSQLiteCache.MISS
+
+    def __init__(self, ns, max_entries=1024, store: NSQLiteCache = None) -> None:
+        self.ns = ns
+        self.memory = NMemoryCache(max_entries)
+        self._store = store
+
+    @property
+    def store(self):
+        return get_cache() if self._store is None else self._store
+
+    def get(self, key, default=MISS):
+        entry = self.memory.get_entry(key)
+        if entry is NTieredCache.MISS:
+            entry = self.store.get_entry(self.ns, key)
+            if entry is NTieredCache.MISS:
+                return default
+            self.memory.set(key, entry[0], 0, expires=entry[1])
+        return entry[0]
+
+    def set(self, key, value, ttl):
+        self.memory.set(key, value, ttl)
+        self.store.set(self.ns, key, value, ttl)
+
+    def get_stats(self):
+        store = self.store.get_stats()
+        return {
+            'memory': self.memory.get_stats(),
+            'hits': store['hits'].get(self.ns, 0),
+            'misses': store['misses'].get(self.ns, 0),
+        }
+
+
+class NSingleFlight:
+    # 같은 키로 동시에 들어온 호출은 한 번만 실행하고 결과를 공유
+    def __init__(self) -> None:
+        self._calls = {}  # key -> Future
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            value = fn()
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+def normalize_param(value):
+    if isinstance(value, float):
+        return '%.7f' % value
+    return str(value)
+
+
+def make_cache_key(route, params: dict):
+    # 값이 None인 파라미터는 전송되지 않으므로 키에서도 제외
+    items = sorted((k, normalize_param(v)) for k, v in params.items() if v is not None)
+    return route + '?' + json.dumps(items, ensure_ascii=False, separators=(',', ':'))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = NSQLiteCache()
+    return _cache
+
+
+def configure_cache(path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+    global _cache
+    with _cache_lock:
+        _cache = NSQLiteCache(path, max_bytes)
+    return _cache
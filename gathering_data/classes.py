@@ -1,6 +1,5 @@
-from shapely.geometry import Point, Polygon
-import cv2
 import numpy as np
+# shapely, cv2는 실제로 사용할 때 import (앱 시작 시간 단축)
 
 
 # Con
@@ -11,6 +10,7 @@ def LIST_EXTENDS(v1: list, v2: list):
 
 
 class NLocation:
+    __slots__ = ('lat', 'lon', 'zoom')
     TO_INTEGER = 10 ** 8
 
     def __init__(self, lat, lon, zoom=16):
@@ -39,20 +39,35 @@ class NMap:
         for vs in shape_vertexs:
             if len(vs) == 0: continue
             self.vertexs.append(vs)
-        self.polys = [Polygon(vs) for vs in self.vertexs]
+        import shapely
+        self.polys = [shapely.Polygon(vs) for vs in self.vertexs]
+        for poly in self.polys:
+            shapely.prepare(poly)
+        # (minLat, minLon, maxLat, maxLon) per polygon
+        self.bounds = np.array([poly.bounds for poly in self.polys], dtype=float).reshape(-1, 4)
 
     def contain(self, loc: NLocation):
-        p = Point(loc.lat, loc.lon)
-        for poly in self.polys:
-            if p.within(poly) is True:
-                return True
-        return False
+        return bool(self.contains_many([loc.lat], [loc.lon])[0])
+
+    def contains_many(self, lats, lons):
+        import shapely
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        res = np.zeros(len(lats), dtype=bool)
+        for poly, (mnLat, mnLon, mxLat, mxLon) in zip(self.polys, self.bounds):
+            # bbox 밖의 점은 다각형 검사 생략
+            cand = ~res & (lats >= mnLat) & (lats <= mxLat) & (lons >= mnLon) & (lons <= mxLon)
+            if cand.any():
+                res[cand] = shapely.contains_xy(poly, lats[cand], lons[cand])
+        return res
 
     def get_dimension(self):
         return NDimension(self.vertexs)
 
 
 class NDust:
+    __slots__ = ('tag', 'lat', 'lon')
+
     def __init__(self, tag, loc) -> None:
         self.tag = tag
         self.lat, self.lon = loc[0], loc[1]
@@ -66,31 +81,65 @@ class NDimension:
     def __init__(self, vertexs: list) -> None:
         self.x_scale, self.y_scale = NDimension.get_scale(vertexs)
         self.outlines = [NDimension.fit_scale_with_split(v, (self.x_scale, self.y_scale)) for v in vertexs]
+        self._bg = None  # 배경(경계선) 이미지, 처음 그릴 때 생성
 
     def get_img(self, data: list[NDust] = [], tag_color={}):
-        img = self.get_bg_img()
+        if len(data) == 0: return self.get_bg_img()
+        points = np.array([(v.lat, v.lon) for v in data], dtype=np.int32)
+        return self.get_points_img(points, [v.tag for v in data], tag_color)
 
-        if len(data) == 0: return img
-        return NDimension.dot_vertexs(img, data, tag_color)
+    def get_points_img(self, points, tags, tag_color={}):
+        # points: fit_points 결과 (N, 2), tags: 각 점의 태그
+        img = self.get_bg_img()
+        if len(points) == 0: return img
+        return NDimension.dot_points(img, points, tags, tag_color)
 
     def get_bg_img(self):
-        size = NDimension.RESOLUTION + 2 * NDimension.PADDING
-        img = np.zeros((size[0], size[1], 3), dtype=np.uint8) + 255
-        for ol in self.outlines:
-            img = NDimension.draw_vertexs(img, ol)
-        return img
+        if self._bg is None:
+            size = NDimension.RESOLUTION + 2 * NDimension.PADDING
+            img = np.zeros((size[0], size[1], 3), dtype=np.uint8) + 255
+            for ol in self.outlines:
+                img = NDimension.draw_vertexs(img, ol)
+            img.flags.writeable = False
+            self._bg = img
+        return self._bg.copy()
+
+    def fit_points(self, lats, lons):
+        # 위도/경도 배열 -> 이미지 좌표 (N, 2), fit_scale을 한 번에 적용
+        return np.column_stack((
+            NDimension.fit_scale(np.asarray(lats, dtype=float), self.x_scale),
+            NDimension.fit_scale(np.asarray(lons, dtype=float), self.y_scale, 1)
+        )).astype(np.int32).reshape(-1, 2)
 
     @classmethod
     def draw_vertexs(self, img, vertexs):
-        img = cv2.line(img, vertexs[0], vertexs[-1], (0, 0, 0), NDimension.LINE_WIDTH)
-        for i in range(len(vertexs) - 1):
-            img = cv2.line(img, vertexs[i], vertexs[i + 1], (0, 0, 0), NDimension.LINE_WIDTH)
-        return img
+        import cv2
+        pts = np.asarray(vertexs, dtype=np.int32).reshape(-1, 1, 2)
+        return cv2.polylines(img, [pts], True, (0, 0, 0), NDimension.LINE_WIDTH)
 
     @classmethod
     def dot_vertexs(self, img, vertexs: list[NDust], tag_color):
-        for v in vertexs:
-            cv2.circle(img, (v.lat, v.lon), NDimension.LINE_WIDTH, tag_color[v.tag], -1)
+        points = np.array([(v.lat, v.lon) for v in vertexs], dtype=np.int32).reshape(-1, 2)
+        return NDimension.dot_points(img, points, [v.tag for v in vertexs], tag_color)
+
+    @classmethod
+    def dot_points(cls, img, points, tags, tag_color):
+        # 모든 점을 한 번에: 중심에 (점 번호 + 1)을 찍고 원 모양 커널로 최대값 팽창
+        # -> 각 픽셀은 그 픽셀을 덮는 마지막 점의 색 (cv2.circle을 순서대로 그린 것과 같은 결과)
+        import cv2
+        r = NDimension.LINE_WIDTH
+        h, w = img.shape[:2]
+        kernel = cv2.circle(np.zeros((2 * r + 1, 2 * r + 1), dtype=np.uint8), (r, r), r, 1, -1)
+        x, y = points[:, 0] + r, points[:, 1] + r  # 가장자리 밖 점의 일부도 그리도록 r만큼 여유
+        inside = np.flatnonzero((x >= 0) & (x < w + 2 * r) & (y >= 0) & (y < h + 2 * r))
+        order = np.zeros((h + 2 * r, w + 2 * r), dtype=np.uint16 if len(points) < 65535 else np.float32)
+        np.maximum.at(order, (y[inside], x[inside]), inside + 1)
+        order = cv2.dilate(order, kernel)[r:r + h, r:r + w]
+
+        palette = {tag: tag_color[tag] for tag in dict.fromkeys(tags)}
+        colors = np.array([palette[t] for t in tags], dtype=np.uint8).reshape(-1, 3)
+        hit = order > 0
+        img[hit] = colors[order[hit].astype(np.intp) - 1]
         return img
 
     @classmethod
@@ -198,6 +247,7 @@ class NRE_ROUTER:
 
 
 class NNeighborAround:
+    __slots__ = ('counter',)
     HEADER = ['BUS', 'METRO', 'INFANT', 'PRESCHOOL', 'HOSPITAL',
               'PARKING', 'MART', 'CONVENIENCE', 'WASHING', 'BANK', 'OFFICE',
               'PRI_SCHOOL', 'PUB_SCHOOL']
@@ -222,11 +272,20 @@ class NNeighborAround:
     def increase(self, tag=''):
         self.counter[tag] += 1
 
+    @classmethod
+    def from_counts(cls, counts):
+        # HEADER 순서의 집계 결과로 생성
+        around = cls()
+        for tag, count in zip(cls.HEADER, counts):
+            around.counter[tag] = int(count)
+        return around
+
     def get_list(self):
         return self.counter.values()
 
 
 class NNeighbor:
+    __slots__ = ('type', 'name', 'loc')
     BUS = 'BUS'  # 버스정류장
     METRO = 'METRO'  # 지하철
     KID = 'INFANT'  # 어린이집
@@ -252,6 +311,8 @@ class NNeighbor:
 
 
 class NArea:
+    __slots__ = ('mn', 'mx', 'representative', 'floorRatio')
+
     def __init__(self, mn, mx, representative, floorRatio) -> None:
         self.mn = mn
         self.mx = mx
@@ -260,6 +321,8 @@ class NArea:
 
 
 class NPrice:
+    __slots__ = ('mn', 'mx', 'med')
+
     def __init__(self, mn, mx, med) -> None:
         self.mn = mn if mn != 0 else None
         self.mx = mx if mx != 0 else None
@@ -270,8 +333,10 @@ class NPrice:
 
 
 class NThing:
+    __slots__ = ('no', 'type', 'buildTime', 'area', 'name', 'loc', 'deal', 'udeal', 'lease', 'ulease', 'dir',
+                 'neiAround')
     HEADER = LIST_EXTENDS(['Name', 'Type', 'Build',
-                           'Dir', 'minArea', 'maxArea',
+                           'Dir', 'dirMask', 'minArea', 'maxArea',
                            'representativeArea', 'floorAreaRatio',
                            'minDeal', 'maxDeal', 'medianDeal',
                            'minLease', 'maxLease', 'medianLease',
@@ -291,11 +356,12 @@ class NThing:
         self.lease = lease  # type: NPrice
         self.ulease = ulease  # type: NPrice
         self.dir = ''
+        self.no = ''  # 단지 번호 (markerId)
         self.neiAround = NNeighborAround()
 
     def get_list(self):
         return LIST_EXTENDS(
-            [self.name, self.type, self.buildTime, self.dir, self.area.mn, self.area.mx, self.area.representative,
+            [self.name, self.type, self.buildTime, self.dir, NAddon.to_dir_mask(self.dir), self.area.mn, self.area.mx, self.area.representative,
              self.area.floorRatio,
              self.deal.mn, self.deal.mx, self.deal.med, self.lease.mn, self.lease.mx, self.lease.med, self.udeal.mn,
              self.udeal.mx, self.udeal.med, self.ulease.mn, self.ulease.mx, self.ulease.med, self.loc.lat,
@@ -305,6 +371,169 @@ class NThing:
         return "%s %s %s" % (self.name, self.type, self.buildTime)
 
 
+class NThingFrame:
+    # parse_things 결과를 열(column) 단위 NumPy 배열로 보관, 열 이름은 NThing.HEADER 기준
+    TEXT = ['No', 'Name', 'Type', 'Build', 'Dir']
+    NUMBER = ['minArea', 'maxArea', 'representativeArea', 'floorAreaRatio',
+              'minDeal', 'maxDeal', 'medianDeal',
+              'minLease', 'maxLease', 'medianLease',
+              'minDealUnit', 'maxDealUnit', 'medianDealUnit',
+              'minLeaseUnit', 'maxLeaseUnit', 'medianLeaseUnit',
+              'Lat', 'Lon', 'dealCount', 'leaseCount']
+    # 방향별 결과를 단지 하나로 합칠 때의 집계 방법 (나머지 열은 거래가 가장 많은 방향의 값,
+    # 중간값은 그 방향에 값이 없으면 다음으로 거래가 많은 방향의 값)
+    MERGE_MEDIAN = ['medianDeal', 'medianLease', 'medianDealUnit', 'medianLeaseUnit']
+    MERGE_MIN = ['minArea', 'minDeal', 'minLease', 'minDealUnit', 'minLeaseUnit']
+    MERGE_MAX = ['maxArea', 'maxDeal', 'maxLease', 'maxDealUnit', 'maxLeaseUnit']
+    # 거래 수는 방향별 응답이 같은 매물을 다시 셀 수 있어 더하지 않고 가장 큰 값 (단지 전체보다 작을 수 있음)
+    MERGE_COUNT = ['dealCount', 'leaseCount']
+    # (열 이름, COMPLEX2 응답 키, 0을 결측으로 볼지 - NPrice와 동일)
+    SOURCE = [('No', 'markerId', False), ('Name', 'complexName', False), ('Type', 'realEstateTypeCode', False),
+              ('Build', 'completionYearMonth', False),
+              ('minArea', 'minArea', False), ('maxArea', 'maxArea', False),
+              ('representativeArea', 'representativeArea', False), ('floorAreaRatio', 'floorAreaRatio', False),
+              ('minDeal', 'minDealPrice', True), ('maxDeal', 'maxDealPrice', True),
+              ('medianDeal', 'medianDealPrice', True),
+              ('minLease', 'minLeasePrice', True), ('maxLease', 'maxLeasePrice', True),
+              ('medianLease', 'medianLeasePrice', True),
+              ('minDealUnit', 'minDealUnitPrice', True), ('maxDealUnit', 'maxDealUnitPrice', True),
+              ('medianDealUnit', 'medianDealUnitPrice', True),
+              ('minLeaseUnit', 'minLeaseUnitPrice', True), ('maxLeaseUnit', 'maxLeaseUnitPrice', True),
+              ('medianLeaseUnit', 'medianLeaseUnitPrice', True),
+              ('Lat', 'latitude', False), ('Lon', 'longitude', False),
+              ('dealCount', 'dealCount', False), ('leaseCount', 'leaseCount', False)]
+
+    def __init__(self, columns: dict = None, around=None) -> None:
+        columns = {} if columns is None else columns
+        size = len(next(iter(columns.values()))) if len(columns) > 0 else 0
+        self.columns = {}
+        for c in NThingFrame.TEXT:
+            self.columns[c] = columns[c] if c in columns else np.full(size, '', dtype=object)
+        for c in NThingFrame.NUMBER:
+            self.columns[c] = columns[c] if c in columns else np.full(size, np.nan)
+        # 방향 비트 (NAddon.DIR_EACH 순서)
+        self.columns['dirMask'] = columns['dirMask'] if 'dirMask' in columns else np.zeros(size, dtype=np.int16)
+        # 편의시설 수 (매물 수, NNeighborAround.HEADER)
+        self.around = np.zeros((size, len(NNeighborAround.HEADER)), dtype=np.int32) if around is None else around
+
+    @classmethod
+    def from_complexes(cls, results: list, dir=''):
+        columns = {}
+        for col, key, zero_is_none in cls.SOURCE:
+            if col in cls.TEXT:
+                arr = np.empty(len(results), dtype=object)
+                arr[:] = [v.get(key, '') for v in results]
+            else:
+                arr = np.array([cls.to_number(v.get(key), zero_is_none) for v in results], dtype=float)
+            columns[col] = arr
+        columns['Dir'] = np.full(len(results), NAddon.preprocess(dir), dtype=object)
+        columns['dirMask'] = np.full(len(results), NAddon.to_dir_mask(dir), dtype=np.int16)
+        return cls(columns)
+
+    @classmethod
+    def to_number(cls, value, zero_is_none=False):
+        if value is None or value == '':
+            return np.nan
+        value = float(value)
+        return np.nan if zero_is_none and value == 0 else value
+
+    @classmethod
+    def concat(cls, frames: list):
+        frames = [f for f in frames if len(f) > 0]
+        if len(frames) == 0: return cls()
+        if len(frames) == 1: return frames[0]
+        columns = {c: np.concatenate([f.columns[c] for f in frames]) for c in frames[0].columns}
+        return cls(columns, np.concatenate([f.around for f in frames]))
+
+    def merge_directions(self):
+        # 같은 단지(No)가 방향마다 한 행씩 있으면 한 행으로 합침 (단지가 처음 나온 순서 유지)
+        if len(self) == 0: return self
+        keys = np.array([str(no) if no else '%s|%s|%s' % (name, lat, lon) for no, name, lat, lon in
+                         zip(self.columns['No'], self.columns['Name'], self.columns['Lat'], self.columns['Lon'])],
+                        dtype=object)
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        if len(first) == len(self): return self
+        order = np.argsort(first, kind='stable')  # 그룹 번호 -> 출력 위치
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        group = rank[inverse]
+        size = len(order)
+
+        # 그룹마다 거래(매매 + 전세)가 가장 많은 행을 대표로
+        counts = np.nan_to_num(self.columns['dealCount']) + np.nan_to_num(self.columns['leaseCount'])
+        by_count = np.lexsort((-counts, group))
+        best = by_count[np.r_[0, np.flatnonzero(np.diff(group[by_count])) + 1]]
+        merged = self.take(best)
+
+        sorted_group = group[by_count]
+        for c in NThingFrame.MERGE_MEDIAN:
+            values = self.columns[c][by_count]
+            valid = np.flatnonzero(~np.isnan(values))
+            pick = np.full(size, len(values))
+            np.minimum.at(pick, sorted_group[valid], valid)
+            merged.columns[c] = np.append(values, np.nan)[pick]
+        for c in NThingFrame.MERGE_MIN:
+            out = np.full(size, np.nan)
+            np.fmin.at(out, group, self.columns[c])
+            merged.columns[c] = out
+        for c in NThingFrame.MERGE_MAX:
+            out = np.full(size, np.nan)
+            np.fmax.at(out, group, self.columns[c])
+            merged.columns[c] = out
+        for c in NThingFrame.MERGE_COUNT:
+            out = np.zeros(size)
+            np.maximum.at(out, group, np.nan_to_num(self.columns[c]))
+            merged.columns[c] = out
+        mask = np.zeros(size, dtype=np.int16)
+        np.bitwise_or.at(mask, group, self.columns['dirMask'])
+        merged.columns['dirMask'] = mask
+        merged.columns['Dir'] = np.array([NAddon.from_dir_mask(m) for m in mask], dtype=object)
+        np.maximum.at(merged.around, group, self.around)
+        return merged
+
+    def take(self, index):
+        return NThingFrame({c: v[index] for c, v in self.columns.items()}, self.around[index])
+
+    def __len__(self):
+        return len(self.columns['Name'])
+
+    def __getitem__(self, i) -> NThing:
+        # 객체가 필요한 코드를 위해 i번째 행으로 새 NThing을 만들어 반환 (복사본)
+        # 반환된 객체를 수정해도 frame에는 반영되지 않음 -> 값 변경은 self.columns[열][i], self.around[i]로
+        c = self.columns
+
+        def value(col):
+            v = c[col][i]
+            return None if v != v else v  # NaN -> None
+
+        thing = NThing(c['Name'][i], c['Type'][i], c['Build'][i], NLocation(c['Lat'][i], c['Lon'][i]),
+                       NArea(value('minArea'), value('maxArea'), value('representativeArea'), value('floorAreaRatio')),
+                       NPrice(value('minDeal'), value('maxDeal'), value('medianDeal')),
+                       NPrice(value('minLease'), value('maxLease'), value('medianLease')),
+                       NPrice(value('minDealUnit'), value('maxDealUnit'), value('medianDealUnit')),
+                       NPrice(value('minLeaseUnit'), value('maxLeaseUnit'), value('medianLeaseUnit')))
+        thing.dir = c['Dir'][i]
+        thing.no = c['No'][i]
+        thing.neiAround = NNeighborAround.from_counts(self.around[i])
+        return thing
+
+    def __iter__(self):
+        # 행마다 복사본 NThing (__getitem__ 참고)
+        for i in range(len(self)):
+            yield self[i]
+
+    def get_columns(self):
+        # NThing.HEADER 순서의 열 (배열 복사 없음)
+        columns = {c: self.columns[c] for c in NThing.HEADER if c in self.columns}
+        for j, tag in enumerate(NNeighborAround.HEADER):
+            columns[tag] = self.around[:, j]
+        return columns
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.get_columns(), columns=NThing.HEADER, copy=False)
+
+
 class NRegion:
     def __init__(self, name='', loc=None, no='') -> None:
         self.name = name
@@ -356,4 +585,17 @@ class NAddon:
 
     @classmethod
     def get_default(cls):
-        return NAddon([], [cls.TRADE_DEAL], [cls.ESTATE_APT])
\ No newline at end of file
+        return NAddon([], [cls.TRADE_DEAL], [cls.ESTATE_APT])
+
+    @classmethod
+    def to_dir_mask(cls, dir):
+        # 'EE:SS' 또는 ['EE', 'SS'] -> DIR_EACH 순서의 비트
+        dirs = dir.split(':') if type(dir) == str else dir
+        mask = 0
+        for i, d in enumerate(cls.DIR_EACH):
+            if d in dirs: mask |= 1 << i
+        return mask
+
+    @classmethod
+    def from_dir_mask(cls, mask):
+        return ':'.join(d for i, d in enumerate(cls.DIR_EACH) if int(mask) >> i & 1)
\ No newline at end of file
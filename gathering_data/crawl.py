@@ -0,0 +1,121 @@
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from gathering_data.classes import *
+from gathering_data.util import default_loop, get_all_on_sector, get_distance_standard, get_region_list, get_sector, \
+    update_things_intersection
+
+ROOT_REGION = '0000000000'  # 전국
+CRAWL_WORKERS = 8
+CHECKPOINT_PATH = 'crawl_checkpoint.txt'
+
+
+def is_sector_region(no: str):
+    # cortarNo: 시도(2) 시군구(3) 읍면동(3) 리(2)
+    return no[5:8] != '000'
+
+
+def walk_regions(code=ROOT_REGION, failed: list = None):
+    # 시도 -> 시군구 -> 읍면동 순으로 내려가며 읍면동 지역을 반환
+    # 하위 목록을 받지 못한 지역은 건너뛰고 failed에 기록 (다시 실행하면 그 지역부터 다시 확인)
+    regions = []  # type: list[NRegion]
+    stack = [NRegion(no=code)]
+    while stack:
+        parent = stack.pop()
+        try:
+            children = get_region_list(parent.no)
+        except Exception as e:
+            print("Error", parent, e)
+            if failed is not None:
+                failed.append(parent)
+            continue
+        for reg in children:
+            if is_sector_region(reg.no) or reg.no == parent.no:
+                regions.append(reg)
+            else:
+                stack.append(reg)
+    return regions
+
+
+class NCrawlCheckpoint:
+    # 완료한 cortarNo를 한 줄씩 기록, 다시 실행하면 이어서 진행 (crawl이 실패 없이 끝나면 삭제)
+    def __init__(self, path=CHECKPOINT_PATH) -> None:
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.done = set(line.strip() for line in f if line.strip())
+
+    def __contains__(self, no):
+        return no in self.done
+
+    def add(self, no):
+        with self._lock:
+            if no in self.done: return
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(no + '\n')
+            self.done.add(no)
+
+    def clear(self):
+        with self._lock:
+            self.done = set()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def crawl_sector(reg: NRegion):
+    sector = get_sector(reg.loc)
+    # 오늘 날짜 파티션에 하루 전 캐시 응답이 들어가지 않도록 매물은 새로 받음
+    _, things, neighbors = get_all_on_sector(sector, use_cache=False)
+    update_things_intersection(things, neighbors, get_distance_standard())
+    return sector, things
+
+
+def crawl(code=ROOT_REGION, on_sector=None, workers=CRAWL_WORKERS, checkpoint_path=CHECKPOINT_PATH,
+          loop=default_loop):
+    # on_sector(region, sector, things): 섹터 하나가 끝날 때마다 호출 (저장 등)
+    checkpoint = NCrawlCheckpoint(checkpoint_path)
+    cancel = []
+    regions = [reg for reg in walk_regions(code, cancel) if reg.no not in checkpoint]
+    done = []
+
+    def work(reg):
+        sector, things = crawl_sector(reg)
+        if on_sector is not None:
+            on_sector(reg, sector, things)
+        checkpoint.add(reg.no)
+        return reg
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(work, reg): reg for reg in regions}
+        for future in loop(as_completed(futures)):
+            reg = futures[future]
+            try:
+                done.append(future.result())
+            except Exception as e:
+                print("Error", reg, e)
+                cancel.append(reg)
+    # 실패 없이 끝나면 체크포인트를 지워 다음 실행은 처음부터 다시 수집
+    if not cancel:
+        checkpoint.clear()
+    return done, cancel
+
+
+if __name__ == "__main__":
+    from gathering_data.data_gatherer import to_real_estate_dataframe
+    from gathering_data.storage import STORAGE_PATH, write_sector
+
+    parser = argparse.ArgumentParser(description='Naver 부동산 전국 수집')
+    parser.add_argument('code', nargs='?', default=ROOT_REGION, help='시작 cortarNo (기본: 전국)')
+    parser.add_argument('--workers', type=int, default=CRAWL_WORKERS)
+    parser.add_argument('--checkpoint', default=CHECKPOINT_PATH)
+    parser.add_argument('--out', default=STORAGE_PATH)
+    args = parser.parse_args()
+
+    def save(reg, sector, things):
+        write_sector(to_real_estate_dataframe(things), sector, root=args.out)
+
+    done, cancel = crawl(args.code, save, args.workers, args.checkpoint)
+    print(f"완료 {len(done)}, 실패 {len(cancel)}" + (" (다시 실행하면 실패한 지역부터 이어서 진행)" if cancel else ""))
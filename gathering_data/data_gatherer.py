@@ -1,80 +1,115 @@
 from gathering_data.classes import *
 from gathering_data.util import *
-import requests
-import pandas as pd
-import urllib.parse
+from gathering_data import geocode
+from gathering_data.geocode import NGeocodeCache, get_geocode_cache, get_query_keys
+from gathering_data.metrics import get_metrics, measure, timed
 from dotenv import load_dotenv
 import os
-import streamlit as st
 
 load_dotenv()
 
-os.environ["OPENAI_API_KEY"] = st.secrets["api_key"]
-os.environ["GOOGLE_API_KEY"] = st.secrets["google_api_key"]
-
 class NaverRECrawler:
-    def __init__(self):
+    def __init__(self, concurrent=True):
+        # True: 섹터 내 매물/편의시설 요청을 asyncio로 동시에 수행
+        self.concurrent = concurrent
         self.default_coordinates = {
             "강남역": (37.4979462, 127.0276206),
             "역삼역": (37.5006, 127.0368),
             "선릉역": (37.5044, 127.0505),
         }
-        self.api_key = st.secrets["google_api_key"]
+        self._api_key = None
+
+    @property
+    def api_key(self):
+        # 지오코딩 캐시에 없을 때만 읽음
+        if self._api_key is None:
+            self._api_key = os.environ.get("GOOGLE_API_KEY")
+        if self._api_key is None:
+            import streamlit as st
+            self._api_key = st.secrets["google_api_key"]
+        return self._api_key
 
     def get_coordinates(self, query):
-        encoded_query = urllib.parse.quote(query)
-        search_url = f"https://maps.googleapis.com/maps/api/geocode/json?address={encoded_query}&key={self.api_key}"
-
-        try:
-            response = requests.get(search_url)
-            if response.status_code == 200:
-                data = response.json()
-                if data["status"] == "OK" and data["results"]:
-                    location = data["results"][0]["geometry"]["location"]
-                    return NLocation(float(location["lat"]), float(location["lng"]))
-        except Exception as e:
-            print(f"API Error: {str(e)}")
-
-        if query in self.default_coordinates:
-            return NLocation(*self.default_coordinates[query])
+        cache = get_geocode_cache()
+        cached = cache.get(query)
+        get_metrics().increase('cache', route='geocode',
+                               result='miss' if cached is NGeocodeCache.MISS else 'hit')
+        if cached is not NGeocodeCache.MISS and cached is not None:
+            return NLocation(*cached)
+
+        if cached is NGeocodeCache.MISS:
+            try:
+                with measure('external_seconds', service='geocode'):
+                    response = get_session().get(geocode.GEOCODE_API_URL,
+                                                 params={"address": query, "key": self.api_key},
+                                                 timeout=REQUEST_TIMEOUT)
+                if response.status_code == 200:
+                    data = response.json()
+                    if data["status"] == "OK" and data["results"]:
+                        location = data["results"][0]["geometry"]["location"]
+                        cache.set(query, float(location["lat"]), float(location["lng"]))
+                        return NLocation(float(location["lat"]), float(location["lng"]))
+                    if data["status"] == "ZERO_RESULTS":
+                        cache.set_negative(query)
+            except Exception as e:
+                get_metrics().increase('request_errors', route='geocode', reason=type(e).__name__)
+                print(f"API Error: {str(e)}")
+
+        for key in get_query_keys(query):
+            if key in self.default_coordinates:
+                return NLocation(*self.default_coordinates[key])
 
         raise Exception(f"Location not found for: {query}")
 
-    def search_location(self, query):
+    def search_location(self, query, tradeType=None, estateType=None, use_cache=True):
+        return self.search(query, tradeType, estateType, use_cache)[1]
+
+    @timed('search')
+    def search(self, query, tradeType=None, estateType=None, use_cache=True):
+        # tradeType/estateType: NAddon.TRADE_*, NAddon.ESTATE_* 목록 (기본: 매매/전세, 아파트/오피스텔)
+        # use_cache=False: 매물(COMPLEX2)은 디스크 캐시를 거치지 않고 새로 받음
         location = self.get_coordinates(query)
         print(f"Searching around coordinates: {location}")
         sector = get_sector(location)
-        return self._get_real_estate_data(sector)
+        return sector, self._get_real_estate_data(sector, make_addon_search(tradeType, estateType), use_cache)
 
-    def _get_real_estate_data(self, sector):
-        things = get_things_each_direction(sector)
-        neighbors = get_all_neighbors(sector)
+    def _get_real_estate_data(self, sector, addon: NAddon = None, use_cache=True):
+        if self.concurrent:
+            from gathering_data.async_util import run_all_on_sector
+            _, things, neighbors = run_all_on_sector(sector, addon=addon, use_cache=use_cache)
+        else:
+            _, things, neighbors = get_all_on_sector(sector, addon, use_cache)
         update_things_intersection(things, neighbors, get_distance_standard())
-        df = pd.DataFrame([t.get_list() for t in things], columns=NThing.HEADER)
+        return to_real_estate_dataframe(things)
 
-        # 가격 단위 변환 (만원 -> 억원)
-        price_columns = [
-            "minDeal",
-            "maxDeal",
-            "medianDeal",
-            "minLease",
-            "maxLease",
-            "medianLease",
-        ]
-        for col in price_columns:
-            if col in df.columns:
-                df[col] = df[col].apply(
-                    lambda x: round(x / 10000, 2) if pd.notnull(x) else x
-                )
 
-        return df
+@timed('dataframe', items=len)
+def to_real_estate_dataframe(things: NThingFrame):
+    df = things.to_dataframe()
+
+    # 가격 단위 변환 (만원 -> 억원)
+    price_columns = [
+        "minDeal",
+        "maxDeal",
+        "medianDeal",
+        "minLease",
+        "maxLease",
+        "medianLease",
+    ]
+    for col in price_columns:
+        if col in df.columns:
+            df[col] = (df[col] / 10000).round(2)
+
+    return df
 
 
 if __name__ == "__main__":
+    from gathering_data.storage import write_sector
+
     crawler = NaverRECrawler()
     try:
         location = input("검색할 위치를 입력하세요 (예: 강남역): ")
-        df = crawler.search_location(location)
+        sector, df = crawler.search(location)
 
         print(f"\n총 {len(df)}개의 매물이 검색되었습니다.")
         columns_to_show = [
@@ -87,8 +122,7 @@ if __name__ == "__main__":
         ]
         print(df[columns_to_show].head())
 
-        output_file = f"{location}_real_estate_data.xlsx"
-        df.to_excel(output_file, index=False)
+        output_file = write_sector(df, sector)
         print(f"\n데이터가 {output_file}로 저장되었습니다.")
     except Exception as e:
         print(f"Error: {str(e)}")
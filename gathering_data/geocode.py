@@ -0,0 +1,76 @@
+import os
+import re
+import unicodedata
+from gathering_data.cache import DAY, NTieredCache
+
+GEOCODE_API_URL = os.environ.get('NRE_GEOCODE_URL', 'https://maps.googleapis.com/maps/api/geocode/json')
+GEOCODE_TTL = 90 * DAY
+# 결과 없음(ZERO_RESULTS)은 짧게 캐시
+GEOCODE_NEGATIVE_TTL = 10 * 60
+
+# 같은 장소의 영문/한글 표기
+GEOCODE_ALIASES = {
+    'gangnam station': '강남역',
+    'yeoksam station': '역삼역',
+    'seolleung station': '선릉역',
+    'seoul station': '서울역',
+    'hangang park': '한강공원',
+    'hongdae station': '홍대입구역',
+    'hongik university station': '홍대입구역',
+    'itaewon station': '이태원역',
+    'busan station': '부산역',
+    'daejeon station': '대전역',
+}
+
+
+def normalize_query(query: str):
+    query = unicodedata.normalize('NFKC', query).casefold()
+    query = re.sub(r'\s+', ' ', query).strip()
+    query = re.sub(r'\bstn\.?(?=\s|$)', 'station', query)
+    query = re.sub(r'\s+역$', '역', query)  # '강남 역' -> '강남역'
+    return GEOCODE_ALIASES.get(query, query)
+
+
+def get_query_keys(query: str):
+    # 'Gangnam Station(강남역)' 형태는 괄호 안팎을 각각 키로 사용
+    keys = [normalize_query(query)]
+    m = re.match(r'^(.*?)\s*\((.+)\)\s*$', query)
+    if m is not None:
+        keys.extend(normalize_query(part) for part in m.groups() if part.strip())
+    return list(dict.fromkeys(k for k in keys if k))
+
+
+class NGeocodeCache:
+    MISS = NTieredCache.MISS
+
+    def __init__(self, max_entries=1024, store=None) -> None:
+        self.cache = NTieredCache('geocode', max_entries, store)
+
+    def get(self, query: str):
+        # (lat, lon), 결과 없음이 캐시된 경우 None, 모르면 MISS
+        for key in get_query_keys(query):
+            value = self.cache.get(key)
+            if value is not NGeocodeCache.MISS:
+                return None if value is None else tuple(value)
+        return NGeocodeCache.MISS
+
+    def set(self, query: str, lat, lon):
+        for key in get_query_keys(query):
+            self.cache.set(key, [lat, lon], GEOCODE_TTL)
+
+    def set_negative(self, query: str):
+        for key in get_query_keys(query)[:1]:
+            self.cache.set(key, None, GEOCODE_NEGATIVE_TTL)
+
+    def get_stats(self):
+        return self.cache.get_stats()
+
+
+_geocode_cache = None
+
+
+def get_geocode_cache():
+    global _geocode_cache
+    if _geocode_cache is None:
+        _geocode_cache = NGeocodeCache()
+    return _geocode_cache
@@ -0,0 +1,179 @@
+import numpy as np
+from gathering_data.classes import *
+from gathering_data.cache import NMemoryCache
+
+# 전국 공통 격자: 원점에서 (위도, 경도) 방향으로 레벨별 크기의 칸 (레벨이 클수록 촘촘)
+GRID_ORIGIN = (33.0, 124.0)
+GRID_LEVELS = {0: 0.04, 1: 0.02, 2: 0.01, 3: 0.005, 4: 0.0025}  # 위도 방향 칸 크기 (도), 0.01도 ≈ 1.1km
+LON_RATIO = 1.25  # 위도 37도 부근에서 칸이 정사각형에 가깝도록 경도 방향은 더 넓게
+PRICE_COLUMNS = ['medianDealUnit', 'medianLeaseUnit']
+STATS = ['mean', 'median', 'count']
+
+HEATMAP_CACHE_SIZE = 128
+HEATMAP_TTL = 10 * 60
+_grid_cache = NMemoryCache(HEATMAP_CACHE_SIZE)
+
+
+def get_cell_size(level):
+    size = GRID_LEVELS[level]
+    return size, size * LON_RATIO
+
+
+def to_cells(lats, lons, level):
+    # 위도/경도 -> 전국 격자의 (행, 열) 번호
+    lat_size, lon_size = get_cell_size(level)
+    rows = np.floor((np.asarray(lats, dtype=float) - GRID_ORIGIN[0]) / lat_size).astype(np.int64)
+    cols = np.floor((np.asarray(lons, dtype=float) - GRID_ORIGIN[1]) / lon_size).astype(np.int64)
+    return rows, cols
+
+
+class NPriceGrid:
+    # 격자 한 조각 (row0, col0부터 rows x cols 칸), 빈 칸의 mean/median은 NaN
+    def __init__(self, level, row0, col0, count, total, median) -> None:
+        self.level = level
+        self.row0, self.col0 = row0, col0
+        self.count = count  # type: np.ndarray
+        self.sum = total  # type: np.ndarray
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean = np.where(count > 0, total / count, np.nan)
+        self.median = median  # type: np.ndarray
+
+    @property
+    def shape(self):
+        return self.count.shape
+
+    def get(self, stat='mean'):
+        return getattr(self, stat)
+
+    def get_bounds(self):
+        # (minLat, minLon, maxLat, maxLon)
+        lat_size, lon_size = get_cell_size(self.level)
+        rows, cols = self.shape
+        return (GRID_ORIGIN[0] + self.row0 * lat_size, GRID_ORIGIN[1] + self.col0 * lon_size,
+                GRID_ORIGIN[0] + (self.row0 + rows) * lat_size, GRID_ORIGIN[1] + (self.col0 + cols) * lon_size)
+
+    def get_edges(self):
+        # 칸 경계의 위도 (rows + 1), 경도 (cols + 1)
+        lat_size, lon_size = get_cell_size(self.level)
+        rows, cols = self.shape
+        return (GRID_ORIGIN[0] + (self.row0 + np.arange(rows + 1)) * lat_size,
+                GRID_ORIGIN[1] + (self.col0 + np.arange(cols + 1)) * lon_size)
+
+    def get_centers(self):
+        lats, lons = self.get_edges()
+        return (lats[:-1] + lats[1:]) / 2, (lons[:-1] + lons[1:]) / 2
+
+    def to_colors(self, stat='mean', colormap=None, vmin=None, vmax=None):
+        # 칸별 BGR 색 (rows, cols, 3)과 값이 있는 칸 mask
+        import cv2
+        colormap = cv2.COLORMAP_JET if colormap is None else colormap
+        values = self.get(stat).astype(float)
+        valid = ~np.isnan(values) & (self.count > 0)
+        if not valid.any():
+            return np.full(self.shape + (3,), 255, dtype=np.uint8), valid
+        vmin = np.nanmin(values[valid]) if vmin is None else vmin
+        vmax = np.nanmax(values[valid]) if vmax is None else vmax
+        scaled = np.zeros(self.shape, dtype=np.uint8)
+        scaled[valid] = np.clip((values[valid] - vmin) / max(vmax - vmin, 1e-12) * 255, 0, 255).astype(np.uint8)
+        colors = cv2.applyColorMap(scaled, colormap)
+        colors[~valid] = 255
+        return colors, valid
+
+    def to_image(self, stat='mean', cell_px=8, colormap=None):
+        # 북쪽이 위로 오는 래스터 이미지 (BGR)
+        import cv2
+        colors, _ = self.to_colors(stat, colormap)
+        colors = colors[::-1]
+        return cv2.resize(colors, (colors.shape[1] * cell_px, colors.shape[0] * cell_px),
+                          interpolation=cv2.INTER_NEAREST)
+
+    def draw_on(self, dimension: NDimension, img=None, stat='mean', colormap=None):
+        # 섹터 이미지 좌표계(NDimension)에 칸을 칠함, 경계선은 위에 다시 그림
+        img = dimension.get_bg_img() if img is None else img
+        colors, valid = self.to_colors(stat, colormap)
+        lat_edges, lon_edges = self.get_edges()
+        xs = dimension.fit_points(lat_edges, np.full(len(lat_edges), lon_edges[0]))[:, 0]
+        ys = dimension.fit_points(np.full(len(lon_edges), lat_edges[0]), lon_edges)[:, 1]
+        h, w = img.shape[:2]
+        xs, ys = np.clip(xs, 0, w), np.clip(ys, 0, h)
+        for r, c in zip(*np.nonzero(valid)):
+            img[ys[c]:ys[c + 1], xs[r]:xs[r + 1]] = colors[r, c]
+        for ol in dimension.outlines:
+            img = NDimension.draw_vertexs(img, ol)
+        return img
+
+    def to_plotly(self, stat='mean', title=None):
+        # 칸 값만 브라우저로 보냄 (원본 좌표 없음)
+        import plotly.graph_objects as go
+        lats, lons = self.get_centers()
+        values = self.get(stat).astype(float)
+        values = np.where(self.count > 0, values, np.nan)
+        fig = go.Figure(go.Heatmap(z=values, x=lons, y=lats, colorscale='Jet', hoverongaps=False,
+                                   colorbar={'title': stat}))
+        fig.update_layout(title=title, xaxis_title='Lon', yaxis_title='Lat',
+                          yaxis={'scaleanchor': 'x', 'scaleratio': LON_RATIO})
+        return fig
+
+
+def aggregate_grid(lats, lons, values, level=2):
+    # 값(NaN 제외)을 칸별로 모아 count/sum/median
+    lats, lons, values = (np.asarray(v, dtype=float) for v in (lats, lons, values))
+    keep = ~(np.isnan(lats) | np.isnan(lons) | np.isnan(values))
+    lats, lons, values = lats[keep], lons[keep], values[keep]
+    if len(values) == 0:
+        empty = np.zeros((0, 0))
+        return NPriceGrid(level, 0, 0, empty.astype(np.int64), empty, empty)
+
+    rows, cols = to_cells(lats, lons, level)
+    row0, col0 = rows.min(), cols.min()
+    n_rows, n_cols = rows.max() - row0 + 1, cols.max() - col0 + 1
+    cell = (rows - row0) * n_cols + (cols - col0)
+    size = n_rows * n_cols
+
+    count = np.bincount(cell, minlength=size)
+    total = np.bincount(cell, weights=values, minlength=size)
+
+    # 칸 번호, 값 순으로 정렬 후 칸마다 가운데 값
+    order = np.lexsort((values, cell))
+    ordered = values[order]
+    starts = np.cumsum(count) - count
+    lo = np.clip(starts + (count - 1) // 2, 0, len(ordered) - 1)
+    hi = np.clip(starts + count // 2, 0, len(ordered) - 1)
+    median = np.where(count > 0, (ordered[lo] + ordered[hi]) / 2, np.nan)
+
+    shape = (n_rows, n_cols)
+    return NPriceGrid(level, int(row0), int(col0), count.reshape(shape), total.reshape(shape), median.reshape(shape))
+
+
+def get_frame_values(data, column):
+    # NThingFrame 또는 DataFrame(Lat, Lon 열) -> (lats, lons, values)
+    if isinstance(data, NThingFrame):
+        return data.columns['Lat'], data.columns['Lon'], data.columns[column]
+    return data['Lat'].to_numpy(dtype=float), data['Lon'].to_numpy(dtype=float), \
+        data[column].to_numpy(dtype=float, na_value=np.nan)
+
+
+def get_price_grid(key, data, column='medianDealUnit', level=2):
+    # key: 같은 데이터를 가리키는 값 (섹터 번호, (city, division, crawl_date) 등), 레벨별로 캐시
+    cache_key = (key, column, level)
+    grid = _grid_cache.get(cache_key)
+    if grid is NMemoryCache.MISS:
+        grid = aggregate_grid(*get_frame_values(data, column), level)
+        _grid_cache.set(cache_key, grid, HEATMAP_TTL)
+    return grid
+
+
+def get_store_grid(store, column='medianDealUnit', level=1, city=None, division=None, start=None, end=None):
+    # 저장된 크롤링 결과(NEstateStore) 전체에서 격자 생성, 필요한 열만 읽음
+    key = ('store', store.root, city, division, start, end)
+    cache_key = (key, column, level)
+    grid = _grid_cache.get(cache_key)
+    if grid is NMemoryCache.MISS:
+        df = store.read(city=city, division=division, start=start, end=end, columns=['Lat', 'Lon', column])
+        grid = aggregate_grid(*get_frame_values(df, column), level)
+        _grid_cache.set(cache_key, grid, HEATMAP_TTL)
+    return grid
+
+
+def clear_grid_cache():
+    _grid_cache.clear()
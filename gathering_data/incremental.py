@@ -0,0 +1,153 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+from gathering_data.classes import *
+from gathering_data.crawl import ROOT_REGION, CRAWL_WORKERS, walk_regions
+from gathering_data.util import default_loop, get_all_neighbors, get_distance_standard, get_sector, \
+    get_things_each_direction, update_things_intersection
+
+FINGERPRINT_PATH = 'crawl_fingerprint.sqlite3'
+# 변경이 없던 섹터는 다시 확인하기까지의 간격을 두 배씩 늘림 (최대 2 ** MAX_DOUBLING 배)
+REFRESH_INTERVAL = 60 * 60
+MAX_DOUBLING = 4
+
+# 지문(fingerprint)에 쓰는 가격/면적/거래 수 열
+FINGERPRINT_COLUMNS = ['dirMask', 'minArea', 'maxArea', 'representativeArea', 'floorAreaRatio',
+                       'minDeal', 'maxDeal', 'medianDeal',
+                       'minLease', 'maxLease', 'medianLease',
+                       'minDealUnit', 'maxDealUnit', 'medianDealUnit',
+                       'minLeaseUnit', 'maxLeaseUnit', 'medianLeaseUnit',
+                       'dealCount', 'leaseCount']
+
+
+def get_complex_ids(things: NThingFrame):
+    # 단지 번호 (방향별 결과는 merge_directions로 합쳐져 있음)
+    return [str(no) for no in things.columns['No']]
+
+
+def fingerprint_things(things: NThingFrame):
+    values = np.column_stack([things.columns[c] for c in FINGERPRINT_COLUMNS]) if len(things) > 0 \
+        else np.zeros((0, len(FINGERPRINT_COLUMNS)))
+    values = np.where(np.isnan(values), np.nan, values)  # NaN 비트 패턴 통일
+    return [hashlib.blake2b(row.tobytes(), digest_size=12).hexdigest() for row in values]
+
+
+def fingerprint_sector(ids, fps):
+    h = hashlib.blake2b(digest_size=12)
+    for i, fp in sorted(zip(ids, fps)):
+        h.update((i + fp).encode('utf-8'))
+    return h.hexdigest()
+
+
+class NFingerprintStore:
+    def __init__(self, path=FINGERPRINT_PATH) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS complex (
+            sector TEXT NOT NULL, id TEXT NOT NULL, fp TEXT NOT NULL, PRIMARY KEY (sector, id))''')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS sector (
+            no TEXT PRIMARY KEY, fp TEXT NOT NULL, stable INTEGER NOT NULL, checked REAL NOT NULL)''')
+
+    def get_complexes(self, sector_no):
+        with self._lock:
+            return dict(self._conn.execute('SELECT id, fp FROM complex WHERE sector = ?', (sector_no,)))
+
+    def get_sector(self, sector_no):
+        # (fp, stable, checked) 또는 None
+        with self._lock:
+            return self._conn.execute('SELECT fp, stable, checked FROM sector WHERE no = ?',
+                                      (sector_no,)).fetchone()
+
+    def update(self, sector_no, ids, fps, now=None):
+        now = time.time() if now is None else now
+        sector_fp = fingerprint_sector(ids, fps)
+        previous = self.get_sector(sector_no)
+        stable = previous[1] + 1 if previous is not None and previous[0] == sector_fp else 0
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.execute('DELETE FROM complex WHERE sector = ?', (sector_no,))
+            self._conn.executemany('INSERT INTO complex VALUES (?, ?, ?)',
+                                   [(sector_no, i, fp) for i, fp in zip(ids, fps)])
+            self._conn.execute('INSERT OR REPLACE INTO sector VALUES (?, ?, ?, ?)',
+                               (sector_no, sector_fp, stable, now))
+            self._conn.execute('COMMIT')
+        return stable
+
+    def get_due(self, sector_no):
+        # 다음 확인 시각 (변경이 없던 횟수만큼 간격을 늘림)
+        row = self.get_sector(sector_no)
+        if row is None: return 0.0
+        return row[2] + REFRESH_INTERVAL * 2 ** min(row[1], MAX_DOUBLING)
+
+    def order_regions(self, regions: list[NRegion], now=None):
+        # 확인할 때가 된 지역만, 오래 기다린 지역부터
+        now = time.time() if now is None else now
+        due = [(self.get_due(reg.no), reg) for reg in regions]
+        return [reg for t, reg in sorted(due, key=lambda x: x[0]) if t <= now]
+
+
+class NDelta:
+    def __init__(self, key, sector, changed, added, removed, stable) -> None:
+        self.key = key
+        self.sector = sector  # type: NSector
+        self.changed = changed  # type: NThingFrame  # 새로 생기거나 값이 바뀐 행
+        self.added = added  # type: list[bool]  # changed의 각 행이 새 단지인지
+        self.removed = removed  # type: list[str]  # 사라진 단지 id
+        self.stable = stable
+
+    def to_dataframe(self):
+        from gathering_data.data_gatherer import to_real_estate_dataframe
+        df = to_real_estate_dataframe(self.changed)
+        df.insert(0, 'No', self.changed.columns['No'])
+        df.insert(1, 'Change', np.where(self.added, 'added', 'changed'))
+        return df
+
+
+def refresh_sector(sector: NSector, store: NFingerprintStore, key=None, standard=None):
+    key = sector.no if key is None else key
+    # 캐시된 응답(최대 1일)으로는 변경을 알 수 없으므로 항상 새로 받음
+    things = get_things_each_direction(sector, use_cache=False)
+    ids, fps = get_complex_ids(things), fingerprint_things(things)
+    previous = store.get_complexes(key)
+
+    changed_mask = np.array([previous.get(i) != fp for i, fp in zip(ids, fps)], dtype=bool)
+    changed = things.take(np.flatnonzero(changed_mask))
+    added = [ids[i] not in previous for i in np.flatnonzero(changed_mask)]
+    removed = sorted(set(previous) - set(ids))
+
+    # 바뀐 단지만 편의시설 교차 집계
+    if len(changed) > 0:
+        neighbors = get_all_neighbors(sector)
+        update_things_intersection(changed, neighbors, get_distance_standard() if standard is None else standard)
+
+    stable = store.update(key, ids, fps)
+    return NDelta(key, sector, changed, added, removed, stable)
+
+
+def refresh(code=ROOT_REGION, on_delta=None, store: NFingerprintStore = None, workers=CRAWL_WORKERS,
+            loop=default_loop):
+    # on_delta(delta): 바뀐 행이 있는 지역마다 호출
+    store = NFingerprintStore() if store is None else store
+    cancel = []
+    regions = store.order_regions(walk_regions(code, cancel))
+    deltas = []
+
+    def work(reg):
+        delta = refresh_sector(get_sector(reg.loc), store, reg.no)
+        if on_delta is not None and (len(delta.changed) > 0 or len(delta.removed) > 0):
+            on_delta(delta)
+        return delta
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(work, reg): reg for reg in regions}
+        for future in loop(as_completed(futures)):
+            try:
+                deltas.append(future.result())
+            except Exception as e:
+                print("Error", futures[future], e)
+                cancel.append(futures[future])
+    return deltas, cancel
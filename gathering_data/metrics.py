@@ -0,0 +1,216 @@
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 수집 on/off
+IS_METRICS = True
+# 0이 아니면 start_metrics_server()가 이 포트에서 Prometheus 텍스트 형식으로 제공
+METRICS_PORT = int(os.environ.get('NRE_METRICS_PORT', '0'))
+METRICS_PREFIX = 'nre_'
+
+# 히스토그램 구간 (상한)
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1 << 10, 4 << 10, 16 << 10, 64 << 10, 256 << 10, 1 << 20, 4 << 20, 16 << 20)
+ITEMS_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+
+class NHistogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=SECONDS_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def get_quantile(self, q):
+        # 구간 안에서 선형 보간한 추정값
+        if self.count == 0: return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if seen + c >= rank and c > 0:
+                lo = self.buckets[i - 1] if i > 0 else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+
+class NMetrics:
+    # 이름 + 라벨 조합별 히스토그램/카운터, 모든 스레드와 streamlit 세션이 공유
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.histograms = {}  # (name, labels) -> NHistogram
+        self.counters = {}  # (name, labels) -> float
+        self.help = {}
+
+    @classmethod
+    def to_labels(cls, labels: dict):
+        return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+    def observe(self, name, value, buckets=SECONDS_BUCKETS, **labels):
+        if not IS_METRICS: return
+        key = (name, NMetrics.to_labels(labels))
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = NHistogram(buckets)
+            hist.observe(value)
+
+    def increase(self, name, amount=1, **labels):
+        if not IS_METRICS: return
+        key = (name, NMetrics.to_labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def get_summary(self):
+        # 히스토그램별 요약 (sidebar 표시용)
+        with self._lock:
+            items = [(name, labels, hist.count, hist.sum, hist.get_quantile(0.5), hist.get_quantile(0.95))
+                     for (name, labels), hist in self.histograms.items()]
+        rows = []
+        for name, labels, count, total, p50, p95 in sorted(items, key=lambda x: -x[3]):
+            rows.append({'metric': name, 'labels': ', '.join(f'{k}={v}' for k, v in labels), 'count': count,
+                         'sum': round(total, 4), 'mean': round(total / count, 4) if count else None,
+                         'p50': None if p50 is None else round(p50, 4),
+                         'p95': None if p95 is None else round(p95, 4)})
+        return rows
+
+    def get_counters(self):
+        with self._lock:
+            return [{'metric': name, 'labels': ', '.join(f'{k}={v}' for k, v in labels), 'value': value}
+                    for (name, labels), value in sorted(self.counters.items())]
+
+    def to_prometheus(self):
+        # Prometheus 텍스트 형식 (version 0.0.4)
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs: return ''
+            escape = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in pairs) + '}'
+
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+        lines = []
+        written = set()
+        for (name, labels), hist in histograms:
+            metric = METRICS_PREFIX + name
+            if metric not in written:
+                written.add(metric)
+                if name in self.help: lines.append(f'# HELP {metric} {self.help[name]}')
+                lines.append(f'# TYPE {metric} histogram')
+            cumulative = 0
+            for bound, c in zip(list(hist.buckets) + ['+Inf'], hist.counts):
+                cumulative += c
+                lines.append(f'{metric}_bucket{fmt(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{metric}_sum{fmt(labels)} {hist.sum}')
+            lines.append(f'{metric}_count{fmt(labels)} {hist.count}')
+        for (name, labels), value in counters:
+            metric = METRICS_PREFIX + name + '_total'
+            if metric not in written:
+                written.add(metric)
+                if name in self.help: lines.append(f'# HELP {metric} {self.help[name]}')
+                lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric}{fmt(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+_metrics = NMetrics()
+_metrics.describe('request_seconds', 'Naver API call time including cache lookup and scheduler wait')
+_metrics.describe('fetch_seconds', 'Single HTTP attempt time')
+_metrics.describe('response_bytes', 'Naver API response body size')
+_metrics.describe('request_errors', 'Failed HTTP attempts by reason')
+_metrics.describe('cache', 'Response cache lookups by result')
+_metrics.describe('stage_seconds', 'Processing stage time')
+_metrics.describe('stage_items', 'Items produced by a processing stage')
+_metrics.describe('external_seconds', 'Geocode / LLM call time')
+
+
+def get_metrics():
+    return _metrics
+
+
+@contextmanager
+def measure(name='stage_seconds', **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        _metrics.observe(name, time.perf_counter() - start, error='1', **labels)
+        raise
+    _metrics.observe(name, time.perf_counter() - start, **labels)
+
+
+def timed(stage, items=None):
+    # 함수 실행 시간을 stage_seconds{stage=...}에, items(결과)를 stage_items에 기록
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not IS_METRICS: return fn(*args, **kwargs)
+            with measure('stage_seconds', stage=stage):
+                res = fn(*args, **kwargs)
+            if items is not None:
+                _metrics.observe('stage_items', items(res), ITEMS_BUCKETS, stage=stage)
+            return res
+        return wrapper
+    return decorator
+
+
+def write_prometheus(path):
+    # node_exporter textfile collector 등에서 읽도록 원자적으로 기록
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(_metrics.to_prometheus())
+    os.replace(tmp, path)
+    return path
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT, host='0.0.0.0'):
+    # GET /metrics, 여러 번 불러도 서버는 하나 (port가 0이면 시작하지 않음)
+    global _server
+    if not port: return None
+    with _server_lock:
+        if _server is None:
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    found = self.path.split('?')[0] in ('/', '/metrics')
+                    body = _metrics.to_prometheus().encode('utf-8') if found else b''
+                    self.send_response(200 if found else 404)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            _server = ThreadingHTTPServer((host, port), Handler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
@@ -0,0 +1,169 @@
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from gathering_data.classes import NRE_ROUTER
+
+# 초당 요청 수 (전체 경로 공유)
+REQUEST_RATE = 10.0
+
+
+class NRequestScheduler:
+    # 숫자가 낮을수록 먼저 처리
+    ROUTE_PRIORITY = {
+        NRE_ROUTER.CORTARS: 0,  # 검색 시작 지점
+        NRE_ROUTER.COMPLEX2: 1,
+        NRE_ROUTER.NEIGHBORHOOD: 2,
+        NRE_ROUTER.SCHOOL: 2,
+        NRE_ROUTER.REGION_LIST: 3,
+    }
+    DEFAULT_PRIORITY = 5
+    WINDOW = 50  # 오류율 계산에 쓰는 최근 응답 수
+    ERROR_RATE_HIGH = 0.1
+    DECREASE = 0.5  # 오류율이 높으면 속도를 절반으로
+    DECREASE_COOLDOWN = 2.0  # seconds, 한 번 줄인 뒤 이 시간과 백오프가 끝날 때까지는 다시 줄이지 않음
+    INCREASE = 0.02  # 정상 응답마다 최대 속도의 2%씩 회복
+    BACKOFF = 0.5  # seconds, 연속 오류마다 2배
+    BACKOFF_MAX = 20
+    MAX_WAIT = 1.0
+
+    def __init__(self, rate=REQUEST_RATE, burst=None, min_rate=0.5, priority={}) -> None:
+        self.max_rate = float(rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.rate = self.max_rate
+        self.burst = max(1.0, self.max_rate) if burst is None else float(burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.pause_until = 0.0
+        self.errors_in_row = 0
+        self.last_decrease_at = None
+        self.decrease_until = 0.0
+        self.outcomes = deque(maxlen=NRequestScheduler.WINDOW)
+        self.priority = dict(NRequestScheduler.ROUTE_PRIORITY)
+        self.priority.update(priority)
+        self._cond = threading.Condition()
+        self._queue = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+
+    def get_priority(self, route=''):
+        return self.priority.get(route, NRequestScheduler.DEFAULT_PRIORITY)
+
+    def _enqueue(self, route):
+        ticket = (self.get_priority(route), next(self._seq))
+        heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _remove(self, ticket):
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+            self._cond.notify_all()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _try(self, ticket, now):
+        # 0: 통과, None: 차례가 아님(알림 대기), 그 외: 기다릴 시간(초)
+        self._refill(now)
+        if now < self.pause_until:
+            return self.pause_until - now
+        if self._queue[0] != ticket:
+            return None
+        if self.tokens >= 1:
+            heapq.heappop(self._queue)
+            self.tokens -= 1
+            self._cond.notify_all()
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self, route=''):
+        with self._cond:
+            ticket = self._enqueue(route)
+            try:
+                while True:
+                    wait = self._try(ticket, time.monotonic())
+                    if wait == 0: return
+                    self._cond.wait(NRequestScheduler.MAX_WAIT if wait is None else min(wait, NRequestScheduler.MAX_WAIT))
+            except BaseException:
+                self._remove(ticket)
+                raise
+
+    async def acquire_async(self, route=''):
+        with self._cond:
+            ticket = self._enqueue(route)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try(ticket, time.monotonic())
+                if wait == 0: return
+                await asyncio.sleep(0.01 if wait is None else min(wait, NRequestScheduler.MAX_WAIT))
+        except BaseException:
+            with self._cond:
+                self._remove(ticket)
+            raise
+
+    def record(self, route='', ok=True, retry_after=None):
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            self.outcomes.append(ok)
+            if ok:
+                self.errors_in_row = 0
+                if self.get_error_rate() <= NRequestScheduler.ERROR_RATE_HIGH:
+                    self.rate = min(self.max_rate, self.rate + self.max_rate * NRequestScheduler.INCREASE)
+            else:
+                self.errors_in_row += 1
+                self.pause_until = max(self.pause_until, now + self.get_backoff(retry_after))
+                # 동시에 보낸 요청들의 실패(429 폭주 등)는 한 번의 감소로 처리
+                if self.get_error_rate() > NRequestScheduler.ERROR_RATE_HIGH and now >= self.decrease_until:
+                    self.rate = max(self.min_rate, self.rate * NRequestScheduler.DECREASE)
+                    self.last_decrease_at = now
+                    self.decrease_until = max(self.pause_until, now + NRequestScheduler.DECREASE_COOLDOWN)
+            self._cond.notify_all()
+
+    def get_backoff(self, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), NRequestScheduler.BACKOFF_MAX)
+            except ValueError:
+                pass
+        # full jitter
+        ceil = NRequestScheduler.BACKOFF * 2 ** max(0, self.errors_in_row - 1)
+        return random.uniform(0, min(NRequestScheduler.BACKOFF_MAX, ceil))
+
+    def get_error_rate(self):
+        if len(self.outcomes) == 0: return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def get_stats(self):
+        with self._cond:
+            return {
+                'rate': self.rate,
+                'max_rate': self.max_rate,
+                'error_rate': self.get_error_rate(),
+                'waiting': len(self._queue),
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = NRequestScheduler()
+    return _scheduler
+
+
+def configure_scheduler(rate=REQUEST_RATE, burst=None, min_rate=0.5, priority={}):
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = NRequestScheduler(rate, burst, min_rate, priority)
+    return _scheduler
@@ -0,0 +1,89 @@
+import threading
+import numpy as np
+from gathering_data.classes import *
+from gathering_data.cache import ROUTE_TTL, NSQLiteCache, get_cache
+
+# 한 번 받아 둔 섹터(CORTARS 응답)의 경계 다각형으로 좌표 -> 섹터를 로컬에서 판별
+SECTOR_INDEX_NS = 'sector-index'
+SECTOR_INDEX_TTL = ROUTE_TTL[NRE_ROUTER.CORTARS]
+
+
+class NSectorIndex:
+    def __init__(self, store: NSQLiteCache = None) -> None:
+        self._store = store
+        self._lock = threading.Lock()
+        self.sectors = {}  # sectorNo -> NSector
+        self._tree = None  # STRtree, 섹터가 추가되면 다음 조회 때 다시 생성
+        self._owners = []  # tree 안 다각형 순서 -> sectorNo
+        self._loaded = False
+
+    @property
+    def store(self):
+        return get_cache() if self._store is None else self._store
+
+    def _load(self):
+        # 처음 조회할 때 디스크에 저장된 섹터를 모두 올림
+        if self._loaded: return
+        from gathering_data.util import parse_sector
+        for no, sector_json in self.store.get_all(SECTOR_INDEX_NS).items():
+            if no not in self.sectors:
+                self.sectors[no] = parse_sector(sector_json)
+        self._loaded = True
+        self._tree = None
+
+    def _build(self):
+        import shapely
+        polys, owners = [], []
+        for no, sector in self.sectors.items():
+            for poly in sector.map.polys:
+                polys.append(poly)
+                owners.append(no)
+        self._tree = shapely.STRtree(polys)
+        self._owners = owners
+
+    def add(self, sector_json: dict, sector: NSector = None):
+        from gathering_data.util import parse_sector
+        sector = parse_sector(sector_json) if sector is None else sector
+        with self._lock:
+            self.sectors[str(sector.no)] = sector
+            self._tree = None
+        self.store.set(SECTOR_INDEX_NS, str(sector.no), sector_json, SECTOR_INDEX_TTL)
+        return sector
+
+    def find(self, loc: NLocation):
+        # loc을 경계 안에 포함하는 섹터, 없으면 None (경계 위의 점도 None -> CORTARS로 확인)
+        import shapely
+        with self._lock:
+            self._load()
+            if len(self.sectors) == 0: return None
+            if self._tree is None: self._build()
+            tree, owners = self._tree, self._owners
+        cands = tree.query(shapely.Point(loc.lat, loc.lon))
+        for no in dict.fromkeys(owners[i] for i in np.sort(cands)):
+            sector = self.sectors[no]
+            if sector.map.contain(loc):
+                return sector
+        return None
+
+    def clear(self):
+        with self._lock:
+            self.sectors.clear()
+            self._tree = None
+            self._loaded = True
+        self.store.clear(SECTOR_INDEX_NS)
+
+    def __len__(self):
+        return len(self.sectors)
+
+
+_sector_index = None
+_sector_index_lock = threading.Lock()
+
+
+def get_sector_index():
+    global _sector_index
+    if _sector_index is None:
+        with _sector_index_lock:
+            if _sector_index is None:
+                _sector_index = NSectorIndex()
+    return _sector_index
@@ -0,0 +1,97 @@
+import datetime
+import glob
+import os
+import uuid
+import duckdb
+import numpy as np
+import pandas as pd
+from gathering_data.classes import *
+
+STORAGE_PATH = 'estate_data'
+
+# 저장 시 자료형 축소 (위도/경도는 정밀도를 위해 float64 유지)
+CATEGORY_COLUMNS = ['Type', 'Dir']
+FLOAT32_COLUMNS = ['minArea', 'maxArea', 'representativeArea', 'floorAreaRatio',
+                   'minDeal', 'maxDeal', 'medianDeal',
+                   'minLease', 'maxLease', 'medianLease',
+                   'minDealUnit', 'maxDealUnit', 'medianDealUnit',
+                   'minLeaseUnit', 'maxLeaseUnit', 'medianLeaseUnit']
+COUNT_COLUMNS = NNeighborAround.HEADER
+
+
+def compact_dataframe(df: pd.DataFrame):
+    df = df.copy()
+    for c in CATEGORY_COLUMNS:
+        if c in df.columns: df[c] = df[c].astype('category')
+    for c in FLOAT32_COLUMNS:
+        if c in df.columns: df[c] = pd.to_numeric(df[c], errors='coerce').astype(np.float32)
+    for c in COUNT_COLUMNS:
+        if c in df.columns: df[c] = df[c].astype(np.int16)
+    return df
+
+
+def get_partition_path(root, city, division, crawl_date):
+    # hive 형식: city=서울시/division=강남구/crawl_date=2024-12-01
+    clean = lambda v: str(v).replace('/', '_').replace('=', '_')
+    return os.path.join(root, f'city={clean(city)}', f'division={clean(division)}',
+                        f'crawl_date={crawl_date.isoformat()}')
+
+
+def write_sector(df: pd.DataFrame, sector: NSector, crawl_date: datetime.date = None, root=STORAGE_PATH):
+    # _get_real_estate_data 결과를 섹터 단위 parquet 파일로 저장 (같은 날 다시 쓰면 교체)
+    crawl_date = datetime.date.today() if crawl_date is None else crawl_date
+    directory = get_partition_path(root, sector.city, sector.divisition, crawl_date)
+    os.makedirs(directory, exist_ok=True)
+
+    df = compact_dataframe(df)
+    df.insert(0, 'SectorNo', str(sector.no))
+    df.insert(1, 'Sector', str(sector.name))
+    path = os.path.join(directory, f'{sector.no}.parquet')
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    df.to_parquet(tmp, engine='pyarrow', compression='zstd', index=False)
+    os.replace(tmp, path)
+    return path
+
+
+class NEstateStore:
+    VIEW = 'estate'
+
+    def __init__(self, root=STORAGE_PATH, database=':memory:') -> None:
+        self.root = root
+        self.con = duckdb.connect(database)
+        self.refresh()
+
+    def refresh(self):
+        # 새 파일이 추가된 뒤 호출
+        pattern = os.path.join(self.root, '**', '*.parquet')
+        self.ready = len(glob.glob(pattern, recursive=True)) > 0
+        if not self.ready: return
+        self.con.execute(f"""CREATE OR REPLACE VIEW {NEstateStore.VIEW} AS
+            SELECT * FROM read_parquet('{pattern.replace("'", "''")}', hive_partitioning = true,
+                                       union_by_name = true)""")
+
+    def read(self, city=None, division=None, start: datetime.date = None, end: datetime.date = None,
+             min_price=None, max_price=None, min_area=None, max_area=None, types=None, columns=None):
+        # 조건은 parquet 스캔과 파티션 선택으로 내려감 (가격 단위: 억원, 면적: ㎡)
+        where, params = [], []
+        if city is not None: where.append('city = ?'); params.append(city)
+        if division is not None: where.append('division = ?'); params.append(division)
+        if start is not None: where.append('crawl_date >= ?'); params.append(start)
+        if end is not None: where.append('crawl_date <= ?'); params.append(end)
+        if min_price is not None: where.append('maxDeal >= ?'); params.append(min_price)
+        if max_price is not None: where.append('minDeal <= ?'); params.append(max_price)
+        if min_area is not None: where.append('representativeArea >= ?'); params.append(min_area)
+        if max_area is not None: where.append('representativeArea <= ?'); params.append(max_area)
+        if types:
+            where.append('Type IN (%s)' % ', '.join('?' * len(types)))
+            params.extend(types)
+
+        if not self.ready:
+            return pd.DataFrame(columns=columns if columns else NThing.HEADER)
+        select = ', '.join('"%s"' % c.replace('"', '""') for c in columns) if columns else '*'
+        sql = f'SELECT {select} FROM {NEstateStore.VIEW}'
+        if where: sql += ' WHERE ' + ' AND '.join(where)
+        return self.con.execute(sql, params).df()
+
+    def sql(self, query, params=[]):
+        return self.con.execute(query, params).df()
@@ -1,36 +1,146 @@
-from time import sleep
-from haversine import haversine
+import numpy as np
 from gathering_data.classes import *
-import requests
-from openai import OpenAI
-import streamlit as st
+from gathering_data.scheduler import get_scheduler
+from gathering_data.cache import DAY, NMemoryCache, NSingleFlight, NSQLiteCache, NTieredCache, ROUTE_TTL, get_cache, \
+    make_cache_key
+from gathering_data.metrics import BYTES_BUCKETS, get_metrics, measure, timed
+from gathering_data.sector_index import get_sector_index
+import time
+import re
+import threading
+import unicodedata
+from collections import deque
 import os
 
-os.environ["OPENAI_API_KEY"] = st.secrets["api-key"]
+# requests, openai, streamlit, haversine은 처음 사용할 때 import (앱 시작 시간 단축)
+_client = None
+_client_lock = threading.Lock()
 
-client = OpenAI()
 
-BASE_API_URL = "https://new.land.naver.com/api/"
+def get_openai_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import streamlit as st
+                from openai import OpenAI
+                os.environ["OPENAI_API_KEY"] = st.secrets["api-key"]
+                _client = OpenAI()
+    return _client
+
+# 로컬 대역 서버(benchmarks.naver_stub) 등으로 바꿀 때 NRE_BASE_API_URL 사용
+BASE_API_URL = os.environ.get('NRE_BASE_API_URL', "https://new.land.naver.com/api/")
 # Check Log
 # Time
 IS_LOGGING = True
+# Naver 응답을 디스크에 캐시 (경로별 유효 기간은 cache.ROUTE_TTL)
+IS_CACHING = True
+
+# HTTP Client
+# (connect, read) seconds
+REQUEST_TIMEOUT = (3.05, 10)
+POOL_SIZE = 32
+RETRY_TOTAL = 4
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    # 프로세스 전역 keep-alive 세션 (연결 재사용)
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({'User-Agent': '*'})
+                _session = session
+    return _session
+
+
+def get(url="", params={}, timeout=None, use_cache=True):
+    # use_cache=False: 캐시를 읽지 않고 새로 받은 응답으로 캐시를 갱신 (크롤링, 변경 확인용)
+    start = time.perf_counter()
+    ttl = ROUTE_TTL.get(url) if IS_CACHING is True else None
+    if ttl is None:
+        res, cache = fetch(url, params, timeout), 'off'
+    elif not use_cache:
+        res, cache = fetch(url, params, timeout), 'bypass'
+        get_cache().set(url, make_cache_key(url, params), res, ttl)
+    else:
+        key = make_cache_key(url, params)
+        res = get_cache().get(url, key)
+        cache = 'miss' if res is NSQLiteCache.MISS else 'hit'
+        if res is NSQLiteCache.MISS:
+            res = fetch(url, params, timeout)
+            get_cache().set(url, key, res, ttl)
+    record_request(url, cache, time.perf_counter() - start)
+    return res
 
-def get(url="", params={}):
-    rep = requests.get(BASE_API_URL + url, params=params, headers={'User-Agent': '*'})
-    if IS_LOGGING is True: print('Get', rep.request.url)
-    if rep.status_code != 200: raise Exception('Response Error')
-    return rep.json()
 
+def fetch(url="", params={}, timeout=None):
+    # 모든 요청은 공유 스케줄러를 거침 (속도 제한, 오류 시 백오프)
+    import requests
+    session = get_session()
+    scheduler = get_scheduler()
+    metrics = get_metrics()
+    timeout = REQUEST_TIMEOUT if timeout is None else timeout
+    for attempt in range(RETRY_TOTAL + 1):
+        last = attempt == RETRY_TOTAL
+        scheduler.acquire(url)
+        start = time.perf_counter()
+        try:
+            rep = session.get(BASE_API_URL + url, params=params, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            scheduler.record(url, False)
+            metrics.increase('request_errors', route=url, reason=type(e).__name__)
+            if last: raise
+            continue
+        if IS_LOGGING is True: print('Get', rep.request.url)
+        record_response(url, rep.status_code, len(rep.content), time.perf_counter() - start)
+        throttled = rep.status_code in RETRY_STATUS
+        scheduler.record(url, not throttled, rep.headers.get('Retry-After') if throttled else None)
+        if throttled and not last: continue
+        if rep.status_code != 200: raise Exception('Response Error')
+        return rep.json()
 
-def get_neighborhood(sector: NSector, nType=''):
+
+def record_request(url, cache, seconds):
+    # cache: 'hit' | 'miss' | 'bypass'(use_cache=False, 새로 받아 캐시 갱신) | 'off'(캐시하지 않는 경로)
+    metrics = get_metrics()
+    metrics.observe('request_seconds', seconds, route=url, cache=cache)
+    if cache != 'off':
+        metrics.increase('cache', route=url, result=cache)
+
+
+def record_response(url, status, size, seconds):
+    metrics = get_metrics()
+    metrics.observe('fetch_seconds', seconds, route=url, status=status)
+    metrics.observe('response_bytes', size, BYTES_BUCKETS, route=url)
+    if status != 200:
+        metrics.increase('request_errors', route=url, reason=status)
+
+
+def get_neighborhood_route(nType=''):
+    return NRE_ROUTER.NEIGHBORHOOD if nType != NNeighbor.SCHOOL else NRE_ROUTER.SCHOOL
+
+
+def make_param_neighborhood(sector: NSector, nType=''):
     param = sector.loc.get_around_param()
     param.update({'zoom': sector.loc.zoom})
-    res = None
     if nType != NNeighbor.SCHOOL:
         param.update({'type': nType})
-        res = get(NRE_ROUTER.NEIGHBORHOOD, param)
-    else:
-        res = get(NRE_ROUTER.SCHOOL, param)
+    return param
+
+
+def get_neighborhood(sector: NSector, nType=''):
+    res = get(get_neighborhood_route(nType), make_param_neighborhood(sector, nType))
     return parse_neighbor(res, nType)
 
 
@@ -64,8 +174,8 @@ def make_param_thing(sector: NSector, addon: NAddon = NAddon.get_default()):
     return param
 
 
-def get_things(sector: NSector, addon=NAddon.get_default()):
-    res = get(NRE_ROUTER.COMPLEX2, make_param_thing(sector, addon))
+def get_things(sector: NSector, addon=NAddon.get_default(), use_cache=True):
+    res = get(NRE_ROUTER.COMPLEX2, make_param_thing(sector, addon), use_cache=use_cache)
     return parse_things(res, sector, addon.dir)
 
 
@@ -74,8 +184,17 @@ def make_param_sector(loc: NLocation):
 
 
 def get_sector(loc: NLocation):
+    # 이미 받아 둔 섹터 경계 안이면 CORTARS 요청 없이 반환
+    if IS_CACHING is True:
+        sector = get_sector_index().find(loc)
+        get_metrics().increase('cache', route='sector-index', result='miss' if sector is None else 'hit')
+        if sector is not None:
+            return sector
     res = get(NRE_ROUTER.CORTARS, make_param_sector(loc))
-    return parse_sector(res)
+    sector = parse_sector(res)
+    if IS_CACHING is True:
+        get_sector_index().add(res, sector)
+    return sector
 
 
 def split_list(list: list, k: int = 5):
@@ -96,30 +215,20 @@ def default_loop(list):
     return list
 
 
-def get_sector_list(regions: list[NRegion], delay: int = 2, interval: int = 10, loop=default_loop):
+def get_sector_list(regions: list[NRegion], loop=default_loop):
+    # 요청 속도는 스케줄러가 조절
     sectors = []
     cancel = []
-    loading = 0
     for reg in loop(regions):
         try:
-            sector = get_sector(reg.loc)
-            sectors.append(sector)
-            loading += 1
-            if loading == interval:
-                sleep(delay)
-                loading = 0
-        except:
+            sectors.append(get_sector(reg.loc))
+        except Exception:
+            # 재시도/백오프는 get()에서 처리됨
             print("Error", reg)
             cancel.append(reg)
-            get_sleep(20)
-            continue
     return sectors, cancel
 
 
-def get_sleep(delay: int = 20):
-    sleep(delay)
-
-
 def make_param_region(code):
     return {'cortarNo': code}
 
@@ -129,6 +238,7 @@ def get_region_list(code="0000000000"):
     return parse_region(res)
 
 
+@timed('parse_region', items=len)
 def parse_region(region_obj={}):
     if len(region_obj) < 1:
         return []
@@ -141,12 +251,14 @@ def parse_region(region_obj={}):
     return regions
 
 
+@timed('parse_sector')
 def parse_sector(sector_json: dict):
     return NSector(sector_json['sectorName'], NLocation(sector_json['centerLat'], sector_json['centerLon']),
                    sector_json['sectorNo'], sector_json['cityName'], sector_json['divisionName'],
                    sector_json['cortarVertexLists'])
 
 
+@timed('parse_neighbor', items=len)
 def parse_neighbor(data, nType):
     res = []  # type: list[NNeighbor]
 
@@ -166,41 +278,28 @@ def parse_neighbor(data, nType):
             ))
 
     if nType == NNeighbor.PRESCHOOL or nType == NNeighbor.KID:
-        res = filter_item(res, lambda x: len(x.name), lambda x, y: x.name in y.name and x.name != y.name)
+        res = filter_contained_names(res)
     return res
 
 
+@timed('parse_things', items=len)
 def parse_things(results, sector: NSector, dir):
-    smap = sector.map
-    res = []  # type: list[NThing]
+    cands = []
     for v in results:
         if 'minDealPrice' not in v and 'minLeasePrice' not in v:
             continue
         if v['dealCount'] == 0 and v['leaseCount'] == 0:
             continue
+        cands.append(v)
 
-        thing = NThing(
-            v['complexName'],
-            v['realEstateTypeCode'],
-            v['completionYearMonth'],
-            NLocation(v['latitude'], v['longitude']),
-            NArea(v['minArea'], v['maxArea'], v['representativeArea'], v['floorAreaRatio']),
-            NPrice(v['minDealPrice'], v['maxDealPrice'], None if 'medianDealPrice' not in v else v['medianDealPrice']),
-            NPrice(v['minLeasePrice'], v['maxLeasePrice'],
-                   None if 'medianLeasePrice' not in v else v['medianLeasePrice']),
-            NPrice(v['minDealUnitPrice'], v['maxDealUnitPrice'],
-                   None if 'medianDealUnitPrice' not in v else v['medianDealUnitPrice']),
-            NPrice(v['minLeaseUnitPrice'], v['maxLeaseUnitPrice'],
-                   None if 'medianLeaseUnitPrice' not in v else v['medianLeaseUnitPrice'])
-        )
-
-        if smap.contain(thing.loc):
-            thing.dir = dir
-            res.append(thing)
-    return res
+    # 섹터 경계 안의 매물만 한 번에 판별
+    inside = sector.map.contains_many([float(v['latitude']) for v in cands],
+                                      [float(v['longitude']) for v in cands])
+    return NThingFrame.from_complexes([v for v, ok in zip(cands, inside) if ok], dir)
 
 
 def distance_between(l1: NLocation, l2: NLocation):
+    from haversine import haversine
     return round(haversine(l1.get_tuple(), l2.get_tuple(), unit='m'))
 
 
@@ -225,23 +324,58 @@ def get_distance_standard(standard={}):
 
 
 def things_to_dusts(things: list[NThing], dimension: NDimension):
-    dusts = []
-    for t in things:
-        dusts.append(NDust(t.type, [
-            dimension.fit_scale(t.loc.lat, dimension.x_scale),
-            dimension.fit_scale(t.loc.lon, dimension.y_scale, 1)
-        ]))
-    return dusts
+    if isinstance(things, NThingFrame):
+        points = dimension.fit_points(things.columns['Lat'], things.columns['Lon'])
+        return [NDust(tag, p) for tag, p in zip(things.columns['Type'], points.tolist())]
+    points = dimension.fit_points([t.loc.lat for t in things], [t.loc.lon for t in things])
+    return [NDust(t.type, p) for t, p in zip(things, points.tolist())]
 
 
 def neighbors_to_dusts(neis: list[NNeighbor], dimension: NDimension):
-    dusts = []
-    for t in neis:
-        dusts.append(NDust(t.type, [
-            dimension.fit_scale(t.loc.lat, dimension.x_scale),
-            dimension.fit_scale(t.loc.lon, dimension.y_scale, 1)
-        ]))
-    return dusts
+    points = dimension.fit_points([t.loc.lat for t in neis], [t.loc.lon for t in neis])
+    return [NDust(t.type, p) for t, p in zip(neis, points.tolist())]
+
+
+# 섹터 번호 -> NDimension (경계선 배경 이미지 포함, 한 섹터에 약 786KB이므로 최근 섹터 몇 개만)
+SECTOR_IMAGE_CACHE_SIZE = 16
+_sector_dimensions = NMemoryCache(SECTOR_IMAGE_CACHE_SIZE)
+
+
+def get_sector_dimension(sector: NSector):
+    dimension = _sector_dimensions.get(sector.no)
+    if dimension is NMemoryCache.MISS:
+        dimension = sector.map.get_dimension()
+        dimension.get_bg_img()
+        _sector_dimensions.set(sector.no, dimension, ROUTE_TTL[NRE_ROUTER.CORTARS])
+    return dimension
+
+
+@timed('render', items=lambda img: 1)
+def render_sector(sector: NSector, things: NThingFrame = None, neighbors: list[NNeighbor] = [], tag_color=None):
+    # 매물/편의시설 점을 섹터 경계 위에 그린 이미지 (BGR)
+    tag_color = NDimension.get_default_tag_color() if tag_color is None else tag_color
+    dimension = get_sector_dimension(sector)
+    lats, lons, tags = [], [], []
+    if things is not None and len(things) > 0:
+        lats.append(np.asarray(things.columns['Lat'], dtype=float))
+        lons.append(np.asarray(things.columns['Lon'], dtype=float))
+        tags.extend(things.columns['Type'])
+    if len(neighbors) > 0:
+        lats.append(np.array([n.loc.lat for n in neighbors], dtype=float))
+        lons.append(np.array([n.loc.lon for n in neighbors], dtype=float))
+        tags.extend(n.type for n in neighbors)
+    if len(tags) == 0:
+        return dimension.get_bg_img()
+    points = dimension.fit_points(np.concatenate(lats), np.concatenate(lons))
+    return dimension.get_points_img(points, tags, tag_color)
+
+
+def encode_image(img, ext='.png'):
+    # 사용자에게 보낼 이미지 바이트 (streamlit st.image 등)
+    import cv2
+    ok, buf = cv2.imencode(ext, img)
+    if not ok: raise Exception('Image Encode Error')
+    return buf.tobytes()
 
 
 def neighbor_prefix_flt(lhs: NNeighbor, rhs: NNeighbor):
@@ -260,14 +394,124 @@ def filter_item(list, to_key, condition):
     return res
 
 
-def update_things_intersection(things: list[NThing], neighbors: list[NNeighbor], standard):
-    for thing in things:  # 매물
-        around = NNeighborAround()
-        for nei in neighbors:  # 편의시설
-            d = distance_between(thing.loc, nei.loc)
-            if d <= standard[nei.type]:  # meter
-                around.increase(nei.type)
-        thing.neiAround = around
+# 고유 이름 수가 이보다 많을 때만 Aho-Corasick 사용 (적을 때는 자동자 생성 비용이 더 큼)
+# benchmarks.dedup: 이름 200개 filter_item 0.3ms / AC 1.2ms, 서로 포함하지 않는 이름 500개 17.9ms / 8.2ms
+DEDUP_AC_MIN_NAMES = 400
+
+
+def find_containing_names(names):
+    # Aho-Corasick: 다른 이름을 부분 문자열로 포함하는 이름의 집합 (전체 길이에 선형)
+    goto = [{}]
+    depth = [0]
+    terminal = [False]
+    for name in names:
+        node = 0
+        for ch in name:
+            nxt = goto[node].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[node][ch] = nxt
+                goto.append({})
+                depth.append(depth[node] + 1)
+                terminal.append(False)
+            node = nxt
+        terminal[node] = True
+
+    fail = [0] * len(goto)
+    has_suffix = [False] * len(goto)  # 자신보다 짧은 접미사 중 이름이 있는지
+    queue = deque(goto[0].values())
+    while queue:
+        node = queue.popleft()
+        for ch, nxt in goto[node].items():
+            f = fail[node]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            fail[nxt] = goto[f][ch] if ch in goto[f] and goto[f][ch] != nxt else 0
+            has_suffix[nxt] = terminal[fail[nxt]] or has_suffix[fail[nxt]]
+            queue.append(nxt)
+
+    res = set()
+    for name in names:
+        node = 0
+        for ch in name:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if has_suffix[node] or (terminal[node] and depth[node] < len(name)):
+                res.add(name)
+                break
+    return res
+
+
+def filter_contained_names(items, to_name=lambda x: x.name):
+    # filter_item(..., lambda x, y: x.name in y.name and x.name != y.name)와 같은 결과:
+    # 다른 이름을 포함하는 항목을 제거, 이름 길이 오름차순 (같은 길이는 입력의 역순)
+    names = set(to_name(it) for it in items)
+    ordered = sorted(reversed(items), key=lambda x: len(to_name(x)))
+    if len(names) <= DEDUP_AC_MIN_NAMES:
+        # 짧은 이름부터, 이미 남긴 더 짧은 이름을 포함하면 제거 (filter_item과 같은 비교를 C 수준 in으로)
+        kept, res = [], []
+        for it in ordered:
+            name = to_name(it)
+            if any(k in name for k in kept if k != name): continue
+            if not kept or kept[-1] != name: kept.append(name)
+            res.append(it)
+        return res
+    if '' in names:
+        contained = names - {''}
+    else:
+        contained = find_containing_names(names)
+    return [it for it in ordered if to_name(it) not in contained]
+
+
+# haversine 패키지와 동일한 지구 평균 반경 (m)
+EARTH_RADIUS_M = 6371008.8
+# 한 번에 계산할 (매물, 편의시설) 쌍의 수
+INTERSECTION_CHUNK = 1 << 20
+
+
+def haversine_matrix(lat1, lon1, lat2, lon2):
+    lat1, lon1 = np.radians(lat1)[:, None], np.radians(lon1)[:, None]
+    lat2, lon2 = np.radians(lat2)[None, :], np.radians(lon2)[None, :]
+    d = np.sin((lat2 - lat1) * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(d))
+
+
+def count_intersection(lat, lon, nei_lat, nei_lon, nei_type, radius, n_types, chunk=INTERSECTION_CHUNK):
+    # 매물별로 반경(radius) 안에 있는 편의시설 수를 종류(nei_type)별로 집계 -> (매물 수, n_types)
+    counts = np.zeros((len(lat), n_types), dtype=np.int64)
+    if len(lat) == 0 or len(nei_lat) == 0:
+        return counts
+    onehot = np.zeros((len(nei_lat), n_types))
+    onehot[np.arange(len(nei_lat)), nei_type] = 1
+    rows = max(1, chunk // len(nei_lat))
+    for start in range(0, len(lat), rows):
+        end = start + rows
+        d = haversine_matrix(lat[start:end], lon[start:end], nei_lat, nei_lon)
+        within = np.rint(d) <= radius  # distance_between과 같이 m 단위 반올림 후 비교
+        counts[start:end] = (within @ onehot).astype(np.int64)
+    return counts
+
+
+@timed('intersection')
+def update_things_intersection(things: NThingFrame, neighbors: list[NNeighbor], standard):
+    types = {t: i for i, t in enumerate(NNeighborAround.HEADER)}
+    if isinstance(things, NThingFrame):
+        lat, lon = things.columns['Lat'], things.columns['Lon']
+    else:
+        lat = np.array([t.loc.lat for t in things], dtype=float)
+        lon = np.array([t.loc.lon for t in things], dtype=float)
+    nei_lat = np.array([n.loc.lat for n in neighbors], dtype=float)
+    nei_lon = np.array([n.loc.lon for n in neighbors], dtype=float)
+    nei_type = np.array([types[n.type] for n in neighbors], dtype=np.intp)
+    radius = np.array([standard[n.type] for n in neighbors], dtype=float)  # meter
+
+    counts = count_intersection(lat, lon, nei_lat, nei_lon, nei_type, radius, len(types))
+    if isinstance(things, NThingFrame):
+        things.around = counts.astype(np.int32)
+        return
+    for thing, row in zip(things, counts):
+        thing.neiAround = NNeighborAround.from_counts(row)
 
 
 def get_all_neighbors(sector):
@@ -277,31 +521,93 @@ def get_all_neighbors(sector):
     return neighbors
 
 
-def get_things_each_direction(sector):
-    addon = NAddon(
+def make_addon_search(tradeType=None, estateType=None):
+    return NAddon(
         # direction=nc.NAddon.DIR_EACH, #전 방향 탐색
-        tradeType=[NAddon.TRADE_DEAL, NAddon.TRADE_LEASE],  # 목표 거래 - 매매, 전세
-        estateType=[NAddon.ESTATE_APT, NAddon.ESTATE_OPST]  # 목표 매물 - 아파트, 오피스텔
+        tradeType=[NAddon.TRADE_DEAL, NAddon.TRADE_LEASE] if tradeType is None else tradeType,  # 목표 거래 - 매매, 전세
+        estateType=[NAddon.ESTATE_APT, NAddon.ESTATE_OPST] if estateType is None else estateType  # 목표 매물 - 아파트, 오피스텔
     )
-    things = []  # 매물 기록
-    for dirr in NAddon.DIR_EACH:  # 모든 방향 (남향 등등)
-        addon.dir = dirr  # 방향 조건 선택
-        things.extend(get_things(sector, addon))
-    return things
 
 
-def get_all_on_sector(sector: NSector):
-    things = get_things_each_direction(sector)
+def make_addon_each_direction(base: NAddon = None):
+    base = make_addon_search() if base is None else base
+    # 모든 방향 (남향 등등)
+    return [NAddon(dirr, base.tradeType, base.estateType) for dirr in NAddon.DIR_EACH]
+
+
+def get_things_each_direction(sector, addon: NAddon = None, use_cache=True):
+    # 매물 기록 (여러 방향에 걸친 단지는 한 행으로)
+    return merge_directions(NThingFrame.concat([get_things(sector, a, use_cache)
+                                                for a in make_addon_each_direction(addon)]))
+
+
+def get_things_fetched_at(sector, addon: NAddon = None):
+    # 방향별 COMPLEX2 캐시 항목 중 가장 오래된 수집 시각 (expires - TTL), 캐시에 없으면 None
+    ttl = ROUTE_TTL[NRE_ROUTER.COMPLEX2]
+    fetched = []
+    for a in make_addon_each_direction(addon):
+        key = make_cache_key(NRE_ROUTER.COMPLEX2, make_param_thing(sector, a))
+        entry = get_cache().get_entry(NRE_ROUTER.COMPLEX2, key)
+        if entry is not NSQLiteCache.MISS:
+            fetched.append(entry[1] - ttl)
+    return min(fetched) if fetched else None
+
+
+@timed('merge_directions', items=len)
+def merge_directions(things: NThingFrame):
+    return things.merge_directions()
+
+
+def get_all_on_sector(sector: NSector, addon: NAddon = None, use_cache=True):
+    # use_cache는 매물(COMPLEX2)에만 적용, 편의시설은 자주 바뀌지 않으므로 캐시 사용
+    things = get_things_each_direction(sector, addon, use_cache)
     neighbors = get_all_neighbors(sector)
     return (sector, things, neighbors)
 
+# 자연어 query -> 지역명 추출 결과 캐시 (모든 streamlit 세션이 공유)
+LOCATION_QUERY_TTL = 30 * DAY
+_location_query_cache = NTieredCache('llm-location', 4096)
+_location_query_flight = NSingleFlight()
+
+
+def normalize_location_query(query: str):
+    query = unicodedata.normalize('NFKC', query).casefold()
+    query = re.sub(r'\s+', ' ', query).strip()
+    return query.rstrip('.?!。 ')
+
+
 # streamlit에서 "Direct Input" 으로 검색 시 자연어 query에서 지역만 파싱하는 함수
 def extract_location_from_query(query: str) -> str:
+    """
+    Extract location information from the query, calling OpenAI only on a cache miss.
+    """
+    exact_key, normalized_key = 'exact:' + query, 'normalized:' + normalize_location_query(query)
+    for key in (exact_key, normalized_key):
+        location = _location_query_cache.get(key)
+        if location is not NTieredCache.MISS:
+            get_metrics().increase('cache', route='llm-location', result='hit')
+            return location
+    get_metrics().increase('cache', route='llm-location', result='miss')
+
+    def request():
+        with measure('external_seconds', service='openai'):
+            location = request_location_from_query(query)
+        if location is not None:
+            for key in (exact_key, normalized_key):
+                _location_query_cache.set(key, location, LOCATION_QUERY_TTL)
+        return location
+
+    # 같은 문장이 동시에 들어오면 OpenAI 호출은 한 번만
+    location = _location_query_flight.do(normalized_key, request)
+    return "Seoul" if location is None else location  # 에러 발생 시 기본값으로 서울 반환 (캐시하지 않음)
+
+
+def request_location_from_query(query: str):
     """
     Extract location information from the query using OpenAI API.
     """
     try:
-        response = client.chat.completions.create(model="gpt-4o",  # 사용할 모델 지정
+        response = get_openai_client().chat.completions.create(model="gpt-4o",  # 사용할 모델 지정
         messages=[
             {"role": "system", "content": (
                 "You are tasked with extracting the most specific location name mentioned in the user's query. "
@@ -318,4 +624,5 @@ def extract_location_from_query(query: str) -> str:
         location = response.choices[0].message.content.strip()
         return location
     except Exception as e:
-        return "Seoul"  # 에러 발생 시 기본값으로 서울 반환
+        get_metrics().increase('request_errors', route='openai', reason=type(e).__name__)
+        return None
@@ -0,0 +1,36 @@
+import copy
+import os
+import sys
+import pytest
+
+# 프로젝트 루트를 import 경로에 추가 (web/pages와 같은 방식)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+@pytest.fixture
+def naver_stub(tmp_path):
+    # 로컬 대역 서버 + 임시 캐시, 끝나면 전역 설정을 되돌림
+    from gathering_data import cache, geocode, sector_index, util
+    from gathering_data.cache import configure_cache
+    from gathering_data.scheduler import configure_scheduler
+    from benchmarks.fixtures import load_fixture
+    from benchmarks.naver_stub import NNaverStub
+
+    stub = NNaverStub(copy.deepcopy(load_fixture('small')), latency=0.0, jitter=0.0).start()
+    saved = (util.BASE_API_URL, util.IS_CACHING, util.IS_LOGGING, geocode.GEOCODE_API_URL)
+    saved_cache = cache._cache  # 기본 경로(~/.cache)의 캐시를 열지 않도록 이전 객체를 그대로 되돌림
+    util.BASE_API_URL, util.IS_CACHING, util.IS_LOGGING = stub.api_url, True, False
+    geocode.GEOCODE_API_URL = stub.geocode_url
+    configure_cache(str(tmp_path / 'cache.sqlite3'))
+    configure_scheduler(1000)
+    sector_index._sector_index = None
+    try:
+        yield stub
+    finally:
+        stub.stop()
+        util.BASE_API_URL, util.IS_CACHING, util.IS_LOGGING, geocode.GEOCODE_API_URL = saved
+        cache._cache = saved_cache
+        configure_scheduler()
+        sector_index._sector_index = None
@@ -0,0 +1,176 @@
+import json
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from gathering_data import cache
+from gathering_data.cache import NSingleFlight, NSQLiteCache, NTieredCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0) -> None:
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, 'time', clock)
+    return clock
+
+
+def blob_size(value):
+    return len(zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8')))
+
+
+def test_get_set_and_namespace_counters(clock):
+    store = NSQLiteCache(':memory:')
+    assert store.get('a', 'k') is NSQLiteCache.MISS
+    store.set('a', 'k', {'v': [1, 2]}, 10)
+    assert store.get('a', 'k') == {'v': [1, 2]}
+    assert store.get_entry('a', 'k') == ({'v': [1, 2]}, clock.now + 10)
+    assert store.get('b', 'k', None) is None
+    stats = store.get_stats()
+    assert stats['hits'] == {'a': 2}
+    assert stats['misses'] == {'a': 1, 'b': 1}
+    assert stats['bytes'] == blob_size({'v': [1, 2]})
+
+
+def test_ttl_expiry(clock):
+    store = NSQLiteCache(':memory:')
+    store.set('a', 'k', 1, 10)
+    clock.now += 10
+    assert store.get('a', 'k') == 1
+    clock.now += 0.5
+    assert store.get('a', 'k') is NSQLiteCache.MISS
+    assert store.get_stats()['misses'] == {'a': 1}
+
+
+def test_get_all_skips_expired_and_counters(clock):
+    store = NSQLiteCache(':memory:')
+    store.set('a', 'k1', 1, 10)
+    store.set('a', 'k2', 2, 100)
+    store.set('b', 'k3', 3, 100)
+    clock.now += 50
+    assert store.get_all('a') == {'k2': 2}
+    assert store.get_stats()['hits'] == {} and store.get_stats()['misses'] == {}
+
+
+def test_evicts_least_recently_used_by_bytes(clock):
+    values = {k: k * 200 for k in 'abcd'}  # 압축 후 크기가 같음
+    size = blob_size(values['a'])
+    store = NSQLiteCache(':memory:', max_bytes=size * 3 + size // 2)
+    for k in 'abc':
+        clock.now += 1
+        store.set('ns', k, values[k], 100)
+    clock.now += 1
+    store.get('ns', 'a')  # a를 최근 사용으로
+    clock.now += 1
+    store.set('ns', 'd', values['d'], 100)
+    assert sorted(store.get_all('ns')) == ['a', 'c', 'd']
+    assert store.size == size * 3
+
+
+def test_evicts_expired_entries_first(clock):
+    size = blob_size('x' * 200)
+    store = NSQLiteCache(':memory:', max_bytes=size * 2)
+    store.set('ns', 'old', 'x' * 200, 100)
+    clock.now += 1
+    store.set('ns', 'short', 'y' * 200, 1)
+    clock.now += 5
+    store.set('ns', 'new', 'z' * 200, 100)
+    assert sorted(store.get_all('ns')) == ['new', 'old']
+
+
+def test_delete_and_clear_update_size(clock):
+    store = NSQLiteCache(':memory:')
+    store.set('a', 'k', 'x' * 100, 10)
+    store.set('b', 'k', 'y' * 100, 10)
+    store.delete('a', 'k')
+    assert store.size == blob_size('y' * 100)
+    store.clear('b')
+    assert store.size == 0 and store.get('b', 'k') is NSQLiteCache.MISS
+
+
+def test_reopen_keeps_entries(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite3')
+    NSQLiteCache(path).set('a', 'k', [1], 10)
+    store = NSQLiteCache(path)
+    assert store.get('a', 'k') == [1]
+    assert store.size == blob_size([1])
+
+
+def test_tiered_cache_promotes_disk_hits(clock):
+    store = NSQLiteCache(':memory:')
+    store.set('geo', 'k', [37.5, 127.0], 100)
+    tiered = NTieredCache('geo', store=store)
+    assert tiered.get('k') == [37.5, 127.0]
+    assert tiered.get('k') == [37.5, 127.0]
+    stats = tiered.get_stats()
+    assert stats['hits'] == 1  # 두 번째는 메모리에서
+    assert stats['memory']['hits'] == 1 and stats['memory']['misses'] == 1
+    # 메모리 항목도 디스크 항목과 같은 시각에 만료
+    clock.now += 101
+    assert tiered.get('k', None) is None
+    assert tiered.get_stats()['misses'] == 1
+
+
+def test_tiered_cache_set_writes_both(clock):
+    store = NSQLiteCache(':memory:')
+    tiered = NTieredCache('geo', store=store)
+    tiered.set('k', 1, 10)
+    assert store.get('geo', 'k') == 1
+    assert tiered.get('k') == 1
+    assert tiered.get_stats()['memory']['hits'] == 1
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = NSingleFlight()
+    n = 8
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(n) as pool:
+        leader = pool.submit(flight.do, 'k', fn)
+        started.wait(5)
+        followers = [pool.submit(flight.do, 'k', fn) for _ in range(n - 1)]
+        while len(flight._calls['k']._condition._waiters) < n - 1:  # 모두 결과를 기다릴 때까지
+            release.wait(0.01)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flight._calls == {}
+
+
+def test_single_flight_shares_errors_and_releases_key():
+    flight = NSingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError('boom')
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flight.do, 'k', fail)
+        started.wait(5)
+        follower = pool.submit(flight.do, 'k', lambda: 'not called')
+        while not flight._calls['k']._condition._waiters:
+            release.wait(0.01)
+        release.set()
+        for f in (leader, follower):
+            with pytest.raises(ValueError):
+                f.result()
+    assert flight.do('k', lambda: 2) == 2
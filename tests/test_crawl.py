@@ -0,0 +1,61 @@
+import os
+import numpy as np
+from gathering_data.classes import *
+from gathering_data.crawl import NCrawlCheckpoint, crawl, crawl_sector, walk_regions
+from gathering_data.util import get_things_each_direction, get_sector
+
+
+def fail_region(stub, code):
+    # 해당 지역의 하위 목록 요청은 404
+    get_region_list = stub.get_region_list
+    stub.get_region_list = lambda c: None if c == code else get_region_list(c)
+
+
+def test_walk_regions_skips_failed_region(naver_stub):
+    fail_region(naver_stub, '1100000000')
+    failed = []
+    regions = walk_regions('0000000000', failed)
+    assert [reg.no for reg in failed] == ['1100000000']
+    assert len(regions) == 6
+    assert all(reg.no.startswith('41') for reg in regions)
+
+
+def test_crawl_reports_failed_region_and_continues(naver_stub, tmp_path):
+    fail_region(naver_stub, '4168000000')
+    done, cancel = crawl('0000000000', checkpoint_path=str(tmp_path / 'checkpoint.txt'), workers=2)
+    assert len(done) == 9
+    assert [reg.no for reg in cancel] == ['4168000000']
+
+
+def test_crawl_sector_does_not_reuse_cached_listings(naver_stub):
+    reg = NRegion('r', NLocation(*naver_stub.center), '1111010100')
+    before = get_things_each_direction(get_sector(reg.loc)).columns['minDeal'].copy()
+    for res in naver_stub.fixture['complexes'].values():
+        for v in res:
+            if 'minDealPrice' in v:
+                v['minDealPrice'] += 1000
+    _, things = crawl_sector(reg)
+    priced = ~np.isnan(before)
+    assert priced.any()
+    assert (things.columns['minDeal'][priced] > before[priced]).all()
+
+
+def test_completed_crawl_clears_checkpoint(naver_stub, tmp_path):
+    path = str(tmp_path / 'checkpoint.txt')
+    first, _ = crawl('0000000000', checkpoint_path=path, workers=2)
+    second, cancel = crawl('0000000000', checkpoint_path=path, workers=2)
+    assert len(first) == 12
+    assert sorted(reg.no for reg in second) == sorted(reg.no for reg in first)
+    assert cancel == []
+    assert not os.path.exists(path)
+
+
+def test_failed_crawl_keeps_checkpoint(naver_stub, tmp_path):
+    path = str(tmp_path / 'checkpoint.txt')
+    fail_region(naver_stub, '4168000000')
+    crawl('0000000000', checkpoint_path=path, workers=2)
+    assert len(NCrawlCheckpoint(path).done) == 9
+    del naver_stub.get_region_list  # 404 해제
+    done, cancel = crawl('0000000000', checkpoint_path=path, workers=2)
+    assert len(done) == 3 and cancel == []
+    assert not os.path.exists(path)
@@ -0,0 +1,48 @@
+import random
+import pytest
+from gathering_data.classes import *
+from gathering_data.util import DEDUP_AC_MIN_NAMES, filter_contained_names, filter_item
+from benchmarks.dedup import make_distinct_names, make_names, make_neighbors
+from benchmarks.fixtures import FIXTURE_SIZES, load_fixture
+
+
+def expected(items):
+    return filter_item(items, lambda x: len(x.name), lambda x, y: x.name in y.name and x.name != y.name)
+
+
+def assert_same(items):
+    assert [id(x) for x in filter_contained_names(items)] == [id(x) for x in expected(items)]
+
+
+@pytest.mark.parametrize('seed', range(100))
+def test_matches_filter_item_on_random_names(seed):
+    rnd = random.Random(seed)
+    items = make_neighbors(make_names(rnd.randint(0, 60), rnd))
+    if rnd.random() < 0.1:
+        items.insert(rnd.randint(0, len(items)), NNeighbor(NNeighbor.KID, '', NLocation(37.5, 127.0)))
+    assert_same(items)
+
+
+@pytest.mark.parametrize('n', [DEDUP_AC_MIN_NAMES - 1, DEDUP_AC_MIN_NAMES + 1, 2 * DEDUP_AC_MIN_NAMES])
+@pytest.mark.parametrize('distinct', [False, True])
+def test_matches_filter_item_around_threshold(n, distinct):
+    # 임계값 양쪽 (filter_item 방식 / Aho-Corasick) 모두
+    rnd = random.Random(n)
+    items = make_neighbors(make_distinct_names(n, rnd) if distinct else make_names(n * 3 // 2, rnd))
+    assert_same(items)
+
+
+def test_matches_filter_item_with_empty_name_above_threshold():
+    rnd = random.Random(0)
+    items = make_neighbors(make_distinct_names(DEDUP_AC_MIN_NAMES + 10, rnd))
+    items.insert(7, NNeighbor(NNeighbor.KID, '', NLocation(37.5, 127.0)))
+    assert_same(items)
+
+
+@pytest.mark.parametrize('name', list(FIXTURE_SIZES))
+def test_matches_filter_item_on_fixtures(name):
+    fixture = load_fixture(name)
+    for nType in (NNeighbor.KID, NNeighbor.PRESCHOOL):
+        items = [NNeighbor(nType, v['name'], NLocation(v['latitude'], v['longitude']))
+                 for v in fixture['neighborhoods'].get(nType, {}).get('neighborhoods', [])]
+        assert_same(items)
@@ -0,0 +1,64 @@
+import pytest
+from gathering_data import cache
+from gathering_data.cache import NSQLiteCache
+from gathering_data.geocode import GEOCODE_NEGATIVE_TTL, GEOCODE_TTL, NGeocodeCache, get_query_keys, \
+    normalize_query
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('Gangnam Station', '강남역'),
+    ('  GANGNAM   station ', '강남역'),
+    ('Gangnam Stn.', '강남역'),
+    ('gangnam stn', '강남역'),
+    ('Hongik University Station', '홍대입구역'),
+    ('강남 역', '강남역'),
+    ('ｓｅｏｕｌ　ｓｔａｔｉｏｎ', '서울역'),  # 전각 문자 (NFKC)
+    ('Pangyo Station', 'pangyo station'),
+    ('stnford', 'stnford'),
+])
+def test_normalize_query(query, expected):
+    assert normalize_query(query) == expected
+
+
+def test_query_keys_split_bilingual_labels():
+    assert get_query_keys('Gangnam Station(강남역)') == ['gangnam station(강남역)', '강남역']
+    assert get_query_keys('판교역 (Pangyo Station)') == ['판교역 (pangyo station)', '판교역', 'pangyo station']
+    assert get_query_keys('강남역') == ['강남역']
+
+
+def test_aliases_share_one_entry(clock):
+    geo = NGeocodeCache(store=NSQLiteCache(':memory:'))
+    assert geo.get('강남역') is NGeocodeCache.MISS
+    geo.set('Gangnam Station(강남역)', 37.49, 127.02)
+    for query in ['강남역', 'gangnam station', 'Gangnam Stn', '강남 역']:
+        assert geo.get(query) == (37.49, 127.02)
+
+
+def test_positive_entries_last_ttl(clock):
+    store = NSQLiteCache(':memory:')
+    NGeocodeCache(store=store).set('서울역', 37.55, 126.97)
+    clock[0] += GEOCODE_TTL - 1
+    assert NGeocodeCache(store=store).get('Seoul Station') == (37.55, 126.97)
+    clock[0] += 2
+    assert NGeocodeCache(store=store).get('Seoul Station') is NGeocodeCache.MISS
+
+
+def test_negative_entries_expire_after_ten_minutes(clock):
+    assert GEOCODE_NEGATIVE_TTL == 10 * 60
+    store = NSQLiteCache(':memory:')
+    geo = NGeocodeCache(store=store)
+    geo.set_negative('없는 장소(Nowhere)')
+    assert geo.get('없는 장소(Nowhere)') is None
+    assert geo.get('Nowhere') is NGeocodeCache.MISS  # 결과 없음은 전체 질의에만 기록
+    clock[0] += GEOCODE_NEGATIVE_TTL - 1
+    assert geo.get('없는 장소(Nowhere)') is None
+    clock[0] += 2
+    assert geo.get('없는 장소(Nowhere)') is NGeocodeCache.MISS
+    assert NGeocodeCache(store=store).get('없는 장소(Nowhere)') is NGeocodeCache.MISS
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from gathering_data.heatmap import GRID_ORIGIN, aggregate_grid, get_cell_size, to_cells
+
+
+def groupby_grid(lats, lons, values, level):
+    # 같은 격자를 pandas groupby로 집계한 기준 결과 {(행, 열): (count, sum, mean, median)}
+    rows, cols = to_cells(lats, lons, level)
+    df = pd.DataFrame({'row': rows, 'col': cols, 'v': values}).dropna()
+    stats = df.groupby(['row', 'col'])['v'].agg(['count', 'sum', 'mean', 'median'])
+    return {key: tuple(v) for key, v in stats.iterrows()}
+
+
+def test_aggregate_grid_matches_groupby():
+    rnd = np.random.default_rng(0)
+    n = 2000
+    lats = 37.5 + rnd.random(n) * 0.1
+    lons = 127.0 + rnd.random(n) * 0.1
+    values = rnd.integers(100, 5000, n).astype(float)
+    values[rnd.random(n) < 0.1] = np.nan
+    lats[:5] = np.nan
+
+    grid = aggregate_grid(lats, lons, values, level=2)
+    expected = groupby_grid(lats[5:], lons[5:], values[5:], 2)
+
+    assert grid.count.sum() == sum(v[0] for v in expected.values())
+    for r, c in zip(*np.nonzero(grid.count)):
+        count, total, mean, median = expected[(grid.row0 + r, grid.col0 + c)]
+        assert grid.count[r, c] == count
+        assert np.isclose(grid.sum[r, c], total)
+        assert np.isclose(grid.mean[r, c], mean)
+        assert grid.median[r, c] == median
+    empty = grid.count == 0
+    assert np.isnan(grid.mean[empty]).all() and np.isnan(grid.median[empty]).all()
+
+
+def test_single_cell_median_differs_from_mean():
+    lat, lon = GRID_ORIGIN[0] + 0.0025, GRID_ORIGIN[1] + 0.0025
+    grid = aggregate_grid([lat] * 4, [lon] * 4, [1.0, 2.0, 3.0, 100.0], level=2)
+    assert grid.shape == (1, 1)
+    assert (grid.row0, grid.col0) == (0, 0)
+    assert grid.count[0, 0] == 4
+    assert grid.mean[0, 0] == 26.5
+    assert grid.median[0, 0] == 2.5
+    lat_size, lon_size = get_cell_size(2)
+    assert np.allclose(grid.get_bounds(), (GRID_ORIGIN[0], GRID_ORIGIN[1],
+                                           GRID_ORIGIN[0] + lat_size, GRID_ORIGIN[1] + lon_size))
+
+
+def test_odd_count_median_and_gap_cells():
+    lat_size, lon_size = get_cell_size(1)
+    lats = [37.0 + lat_size * 0.5] * 3 + [37.0 + lat_size * 2.5]
+    lons = [127.0 + lon_size * 0.5] * 3 + [127.0 + lon_size * 0.5]
+    grid = aggregate_grid(lats, lons, [5.0, 1.0, 3.0, 7.0], level=1)
+    assert grid.shape == (3, 1)
+    assert grid.count[:, 0].tolist() == [3, 0, 1]
+    assert grid.median[0, 0] == 3.0 and grid.median[2, 0] == 7.0
+    assert np.isnan(grid.median[1, 0]) and np.isnan(grid.mean[1, 0])
+
+
+def test_empty_input():
+    grid = aggregate_grid([37.5, np.nan], [127.0, 127.0], [np.nan, 1.0])
+    assert grid.shape == (0, 0)
+    assert grid.count.sum() == 0
+    grid = aggregate_grid([], [], [])
+    assert grid.shape == (0, 0)
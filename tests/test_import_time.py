@@ -0,0 +1,10 @@
+import pytest
+from benchmarks.import_time import IMPORT_BUDGET, LAZY_MODULES, measure
+
+
+@pytest.mark.parametrize('module', list(IMPORT_BUDGET))
+def test_heavy_modules_are_not_imported_eagerly(module):
+    # 새 프로세스에서 -X importtime으로 확인 (시간 예산은 환경마다 달라 python -m benchmarks.import_time으로)
+    total, loaded = measure(module)
+    assert total > 0
+    assert sorted(set(LAZY_MODULES) & loaded) == []
@@ -0,0 +1,45 @@
+from gathering_data.classes import *
+from gathering_data.incremental import NFingerprintStore, refresh_sector
+from gathering_data.util import get_sector, get_things_each_direction
+
+
+def raise_prices(stub):
+    for res in stub.fixture['complexes'].values():
+        for v in res:
+            if 'minDealPrice' in v:
+                v['minDealPrice'] += 1000
+
+
+def test_refresh_sees_upstream_changes_through_cache(naver_stub, tmp_path):
+    store = NFingerprintStore(str(tmp_path / 'fp.sqlite3'))
+    sector = get_sector(NLocation(*naver_stub.center))
+    first = refresh_sector(sector, store)
+    assert len(first.changed) > 0 and first.stable == 0
+
+    # 일반 검색이 COMPLEX2 응답을 디스크 캐시에 채워 둔 상태에서 가격이 바뀜
+    get_things_each_direction(sector)
+    raise_prices(naver_stub)
+
+    second = refresh_sector(sector, store)
+    assert len(second.changed) > 0
+    assert second.stable == 0
+
+
+def test_refresh_marks_unchanged_sector_stable(naver_stub, tmp_path):
+    store = NFingerprintStore(str(tmp_path / 'fp.sqlite3'))
+    sector = get_sector(NLocation(*naver_stub.center))
+    refresh_sector(sector, store)
+    again = refresh_sector(sector, store)
+    assert len(again.changed) == 0
+    assert again.stable == 1
+
+
+def test_refresh_updates_cache_for_searches(naver_stub, tmp_path):
+    # 새로 받은 응답은 캐시에도 기록되어 이후 검색이 최신 값을 봄
+    store = NFingerprintStore(str(tmp_path / 'fp.sqlite3'))
+    sector = get_sector(NLocation(*naver_stub.center))
+    before = get_things_each_direction(sector).columns['minDeal'].copy()
+    raise_prices(naver_stub)
+    refresh_sector(sector, store)
+    after = get_things_each_direction(sector).columns['minDeal']
+    assert (after > before).any()
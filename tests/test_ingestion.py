@@ -0,0 +1,35 @@
+import pandas as pd
+from analysis import ingestion
+from analysis.ingestion import detect_encoding, downcast, load_table
+
+
+def test_detect_encoding_across_chunk_boundaries(monkeypatch):
+    monkeypatch.setattr(ingestion, 'DETECT_CHUNK', 7)  # 한글 3바이트가 조각 경계에 걸리도록
+    assert detect_encoding('가격,이름\n1,강남아파트\n'.encode('utf-8')) == 'utf-8'
+    assert detect_encoding('가격,이름\n1,강남아파트\n'.encode('cp949')) == 'cp949'
+    assert detect_encoding('가'.encode('utf-8')[:2]) == 'cp949'
+
+
+def test_load_table_reads_cp949_csv():
+    data = '구,가격\n강남구,100\n서초구,200\n'.encode('cp949')
+    _, df = load_table(data, 'upload.csv')
+    assert list(df.columns) == ['구', '가격']
+    assert df['구'].astype(str).tolist() == ['강남구', '서초구']
+    assert df['가격'].tolist() == [100, 200]
+
+
+def test_downcast_keeps_integers_signed():
+    df = downcast(pd.DataFrame({'a': [0, 200], 'b': [1, 70000], 'c': [-1, 1]}))
+    assert [str(t) for t in df.dtypes] == ['int16', 'int32', 'int8']
+    assert (df['a'] - 300).tolist() == [-300, -100]
+
+
+def test_large_tables_are_not_cached(monkeypatch):
+    ingestion.clear_table_cache()
+    data = 'a,b\n1,x\n2,y\n'.encode('utf-8')
+    digest, first = load_table(data, 'small.csv')
+    assert load_table(data, 'small.csv', digest)[1] is first
+    monkeypatch.setattr(ingestion, 'INGEST_CACHE_MAX_BYTES', 0)
+    ingestion.clear_table_cache()
+    digest, first = load_table(data, 'large.csv')
+    assert load_table(data, 'large.csv', digest)[1] is not first
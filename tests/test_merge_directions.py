@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from gathering_data.classes import *
+from benchmarks.fixtures import load_fixture
+
+
+def per_direction_frame(fixture):
+    return NThingFrame.concat([NThingFrame.from_complexes(res, dir) for dir, res in fixture['complexes'].items()])
+
+
+def merge_with_pandas(things: NThingFrame):
+    # 방향별 행을 DataFrame groupby로 합친 기준 결과 (merge_directions와 같은 규칙)
+    df = pd.DataFrame({c: things.columns[c] for c in things.columns})
+    around = pd.DataFrame(things.around)
+    df['key'] = [no if no else '%s|%s|%s' % (name, lat, lon) for no, name, lat, lon in
+                 zip(df['No'], df['Name'], df['Lat'], df['Lon'])]
+    df['total'] = df['dealCount'].fillna(0) + df['leaseCount'].fillna(0)
+    keys = df['key'].drop_duplicates().tolist()
+    by_count = df.sort_values('total', ascending=False, kind='stable')
+    grouped = df.groupby('key', sort=False)
+
+    out = by_count.drop_duplicates('key').set_index('key').loc[keys]
+    medians = by_count.groupby('key', sort=False)[NThingFrame.MERGE_MEDIAN].first()
+    out[NThingFrame.MERGE_MEDIAN] = medians.loc[keys]
+    out[NThingFrame.MERGE_MIN] = grouped[NThingFrame.MERGE_MIN].min().loc[keys]
+    out[NThingFrame.MERGE_MAX] = grouped[NThingFrame.MERGE_MAX].max().loc[keys]
+    out[NThingFrame.MERGE_COUNT] = df[NThingFrame.MERGE_COUNT].fillna(0).groupby(df['key'], sort=False).max().loc[keys]
+    out['dirMask'] = grouped['dirMask'].agg(lambda m: np.bitwise_or.reduce(m.to_numpy())).loc[keys]
+    out['Dir'] = [NAddon.from_dir_mask(m) for m in out['dirMask']]
+    return out.reset_index(drop=True), around.groupby(df['key'], sort=False).max().loc[keys].to_numpy()
+
+
+@pytest.mark.parametrize('name', ['small', 'medium'])
+def test_merge_directions_matches_pandas_groupby(name):
+    things = per_direction_frame(load_fixture(name))
+    things.around[:] = np.random.default_rng(0).integers(0, 5, things.around.shape)
+    merged = things.merge_directions()
+    expected, around = merge_with_pandas(things)
+
+    assert len(merged) < len(things)
+    assert len(merged) == len(expected)
+    for c in NThingFrame.TEXT:
+        assert list(merged.columns[c]) == list(expected[c]), c
+    for c in NThingFrame.NUMBER:
+        np.testing.assert_array_equal(merged.columns[c], expected[c].to_numpy(dtype=float), err_msg=c)
+    np.testing.assert_array_equal(merged.columns['dirMask'], expected['dirMask'].to_numpy())
+    np.testing.assert_array_equal(merged.around, around)
+
+
+def make_row(no, dir, deal=None, median=None, dealCount=1, leaseCount=0, **kwargs):
+    v = {'markerId': no, 'complexName': 'c' + no, 'latitude': 37.5, 'longitude': 127.0,
+         'dealCount': dealCount, 'leaseCount': leaseCount}
+    if deal is not None:
+        v.update({'minDealPrice': deal, 'maxDealPrice': deal * 2})
+    if median is not None:
+        v['medianDealPrice'] = median
+    v.update(kwargs)
+    return NThingFrame.from_complexes([v], dir)
+
+
+def test_merge_directions_rules():
+    things = NThingFrame.concat([
+        make_row('1', NAddon.DIR_EE, deal=100, median=None, dealCount=5),
+        make_row('2', NAddon.DIR_SS, deal=300, median=310),
+        make_row('1', NAddon.DIR_SS, deal=80, median=90, dealCount=2),
+        make_row('1', NAddon.DIR_WW, deal=None, median=120, dealCount=3),
+    ])
+    merged = things.merge_directions()
+    assert list(merged.columns['No']) == ['1', '2']  # 처음 나온 순서
+    assert list(merged.columns['Dir']) == ['EE:WW:SS', 'SS']
+    assert merged.columns['minDeal'].tolist() == [80, 300]  # fmin은 NaN을 무시
+    assert merged.columns['maxDeal'].tolist() == [200, 600]
+    # 중간값: 거래가 가장 많은 EE에 값이 없어 다음으로 많은 WW의 값
+    assert merged.columns['medianDeal'].tolist() == [120, 310]
+    assert merged.columns['dealCount'].tolist() == [5, 1]  # 방향별 수를 더하지 않음
+
+
+def test_merge_directions_without_duplicates_returns_same_frame():
+    things = NThingFrame.concat([make_row('1', NAddon.DIR_EE, deal=1), make_row('2', NAddon.DIR_EE, deal=2)])
+    assert things.merge_directions() is things
+    assert len(NThingFrame().merge_directions()) == 0
+
+
+def test_dir_mask_round_trip():
+    for i, d in enumerate(NAddon.DIR_EACH):
+        assert NAddon.to_dir_mask(d) == 1 << i
+    assert NAddon.to_dir_mask('EE:SS') == NAddon.to_dir_mask(['SS', 'EE'])
+    assert NAddon.from_dir_mask(NAddon.to_dir_mask('SS:EE')) == 'EE:SS'
+    assert NAddon.from_dir_mask(2 ** len(NAddon.DIR_EACH) - 1) == ':'.join(NAddon.DIR_EACH)
+    assert NAddon.to_dir_mask('') == 0 and NAddon.from_dir_mask(0) == ''
@@ -0,0 +1,105 @@
+import re
+import pytest
+from gathering_data.metrics import METRICS_PREFIX, NHistogram, NMetrics
+
+LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"(?:,|$)')
+
+
+def unescape(v):
+    return re.sub(r'\\(.)', lambda m: '\n' if m.group(1) == 'n' else m.group(1), v)
+
+
+def parse_prometheus(text):
+    # {(이름, ((라벨, 값), ...)): 값}, {이름: 종류}
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            types[name] = kind
+            continue
+        if line.startswith('#') or not line: continue
+        m = LINE.match(line)
+        assert m is not None, line
+        name, body, value = m.groups()
+        labels = []
+        if body:
+            pos = 0
+            while pos < len(body):
+                lm = LABEL.match(body, pos)
+                assert lm is not None, line
+                labels.append((lm.group(1), unescape(lm.group(2))))
+                pos = lm.end()
+        samples[(name, tuple(sorted(labels)))] = float(value)
+    return samples, types
+
+
+def make_histogram(values, buckets=(1.0, 2.0, 4.0)):
+    hist = NHistogram(buckets)
+    for v in values:
+        hist.observe(v)
+    return hist
+
+
+def test_histogram_buckets_are_upper_bounds():
+    hist = make_histogram([0.5, 1.0, 1.5, 4.0, 9.0])
+    assert hist.counts == [2, 1, 1, 1]  # 마지막 칸은 +Inf
+    assert hist.count == 5 and hist.sum == 16.0
+
+
+def test_quantile_interpolates_within_bucket():
+    hist = make_histogram([0.5, 1.5, 1.5, 3.0])
+    assert hist.get_quantile(0.5) == pytest.approx(1.5)  # 1~2 구간의 가운데
+    assert hist.get_quantile(0.25) == pytest.approx(1.0)
+    assert hist.get_quantile(1.0) == pytest.approx(4.0)
+    assert hist.get_quantile(0.0) == 0.0
+    assert NHistogram().get_quantile(0.5) is None
+
+
+def test_quantile_in_inf_bucket_is_largest_bound():
+    hist = make_histogram([0.5, 100.0, 200.0])
+    assert hist.get_quantile(0.95) == 4.0
+
+
+def test_to_prometheus_histogram_and_counters():
+    metrics = NMetrics()
+    metrics.describe('request_seconds', 'Call time')
+    for v in [0.5, 1.5, 9.0]:
+        metrics.observe('request_seconds', v, (1.0, 2.0), route='/api/complexes')
+    metrics.increase('cache', route='/api/complexes', result='hit')
+    metrics.increase('cache', 2, route='/api/complexes', result='hit')
+    metrics.increase('cache', route='/api/complexes', result='miss', extra=None)
+    text = metrics.to_prometheus()
+    samples, types = parse_prometheus(text)
+
+    hist = METRICS_PREFIX + 'request_seconds'
+    counter = METRICS_PREFIX + 'cache_total'
+    assert types == {hist: 'histogram', counter: 'counter'}
+    assert f'# HELP {hist} Call time' in text.splitlines()
+    route = ('route', '/api/complexes')
+    assert samples[(hist + '_bucket', (('le', '1.0'), route))] == 1
+    assert samples[(hist + '_bucket', (('le', '2.0'), route))] == 2
+    assert samples[(hist + '_bucket', (('le', '+Inf'), route))] == 3
+    assert samples[(hist + '_count', (route,))] == 3
+    assert samples[(hist + '_sum', (route,))] == 11.0
+    assert samples[(counter, (('result', 'hit'), route))] == 3
+    assert samples[(counter, (('result', 'miss'), route))] == 1
+    assert text.endswith('\n')
+
+
+def test_to_prometheus_escapes_label_values():
+    metrics = NMetrics()
+    value = 'a "quoted" \\path\nnext'
+    metrics.increase('request_errors', reason=value)
+    samples, _ = parse_prometheus(metrics.to_prometheus())
+    assert samples == {(METRICS_PREFIX + 'request_errors_total', (('reason', value),)): 1}
+    assert len(metrics.to_prometheus().splitlines()) == 2  # 줄바꿈도 이스케이프되어 한 줄
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    from gathering_data import metrics as module
+    monkeypatch.setattr(module, 'IS_METRICS', False)
+    metrics = NMetrics()
+    metrics.observe('x', 1.0)
+    metrics.increase('y')
+    assert metrics.to_prometheus() == '\n'
@@ -0,0 +1,89 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from analysis import preprocessing
+from analysis.ingestion import load_table
+from analysis.preprocessing import MISSING_VALUES, NORMALIZATION, OUTLIERS, STANDARDIZATION, preprocess, \
+    run_preprocessing
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'price': [10.0, 12.0, np.nan, 11.0, 13.0, 100.0],
+        'rooms': [1, 2, 3, 2, 3, 2],
+        'gu': ['강남', None, '강남', '서초', '강남', '서초'],
+    }, index=list('abcdef'))
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    preprocessing.clear_preprocess_cache()
+    yield
+    preprocessing.clear_preprocess_cache()
+
+
+def test_no_options_keeps_values_and_dtypes(df):
+    out, report = preprocess(df, ['price', 'rooms', 'gu'], [])
+    pd.testing.assert_frame_equal(out, df)
+    assert report['rows_out'] == 6
+    assert report['numeric_columns'] == ['price', 'rooms']
+
+
+def test_impute_uses_median_and_mode(df):
+    out, report = preprocess(df, ['price', 'gu'], [MISSING_VALUES])
+    assert out.loc['c', 'price'] == 12.0
+    assert out.loc['b', 'gu'] == '강남'
+    assert report['imputed'] == 2
+    assert df['price'].isna().sum() == 1  # 원본은 그대로
+
+
+def test_outliers_drop_rows_outside_iqr(df):
+    out, report = preprocess(df, ['price', 'rooms'], [OUTLIERS])
+    assert report['outlier_rows'] == 1  # price 100 (rooms는 Q1 - 1.5 IQR = 0.875 안쪽)
+    assert list(out.index) == ['a', 'b', 'c', 'd', 'e']
+    assert np.isnan(out.loc['c', 'price'])  # NaN은 이상치로 보지 않음
+
+
+def test_standardize_and_normalize(df):
+    out, _ = preprocess(df, ['rooms'], [STANDARDIZATION])
+    expected = (df['rooms'] - df['rooms'].mean()) / df['rooms'].std(ddof=0)
+    np.testing.assert_allclose(out['rooms'], expected)
+    out, _ = preprocess(df, ['price'], [NORMALIZATION])
+    expected = (df['price'] - 10.0) / 90.0
+    np.testing.assert_allclose(out['price'], expected)
+    out, _ = preprocess(pd.DataFrame({'x': [5, 5, 5]}), ['x'], [STANDARDIZATION, NORMALIZATION])
+    assert out['x'].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_run_preprocessing_reuses_result(df, monkeypatch):
+    first = run_preprocessing('digest', df, ['price'], [NORMALIZATION, MISSING_VALUES])
+    monkeypatch.setattr(preprocessing, 'preprocess', lambda *args: pytest.fail('캐시를 사용하지 않음'))
+    assert run_preprocessing('digest', df, ['price'], [MISSING_VALUES, NORMALIZATION]) is first
+
+
+def test_nullable_integer_columns():
+    df = pd.DataFrame({'a': pd.array([1, 2, None, 4], dtype='Int64'), 'b': pd.array([1, 2, 3, 4], dtype='UInt8')})
+    out, _ = run_preprocessing(None, df, ['a', 'b'], [])
+    pd.testing.assert_frame_equal(out, df)
+    out, _ = run_preprocessing(None, df, ['a', 'b'], [MISSING_VALUES])
+    assert out['a'].dtype == 'Int64'
+    assert out['a'].tolist() == [1, 2, 2, 4]
+    out, _ = run_preprocessing(None, df, ['a'], [NORMALIZATION])
+    assert out['a'].dtype == np.float64
+
+
+def test_median_imputation_keeps_fraction_in_integer_column():
+    df = pd.DataFrame({'a': pd.array([1, 2, None, 3, 4], dtype='Int64')})
+    out, _ = preprocess(df, ['a'], [MISSING_VALUES])
+    assert out['a'].tolist() == [1.0, 2.0, 2.5, 3.0, 4.0]
+
+
+def test_parquet_upload_with_nullable_int():
+    pytest.importorskip('pyarrow')
+    buf = io.BytesIO()
+    pd.DataFrame({'a': pd.array([1, None, 3], dtype='Int64')}).to_parquet(buf)
+    digest, df = load_table(buf.getvalue(), 'upload.parquet')
+    out, _ = run_preprocessing(digest, df, ['a'], [])
+    assert out['a'].tolist() == [1, pd.NA, 3]
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+from analysis.PandasAI_Analysis import run
+from analysis.query_catalog import PYEONG, QUERY_CATALOG, find_query, summarize
+
+
+@pytest.fixture
+def data():
+    # data_gatherer 결과와 같은 열 (가격: 억원, 면적: ㎡)
+    return pd.DataFrame({
+        'Name': ['a', 'b', 'c', 'd', 'e'],
+        'Type': ['APT', 'APT', 'OPST', 'APT', 'APT'],
+        'Build': ['200511', '201203', '201001', '', '202008'],
+        'Dir': ['SS', 'EE', 'EE:SS', 'WW', 'SS:NN'],
+        'minDeal': [2.5, 8.0, 1.2, None, 15.0],
+        'maxDeal': [3.0, 9.5, 1.8, None, 18.0],
+        'minDealUnit': [300.0, 950.0, None, None, 1500.0],
+        'representativeArea': [59.0, 84.0, 39.0, 114.0, 135.0],
+    })
+
+
+def names(df):
+    return df['Name'].tolist()
+
+
+def test_catalog_has_five_predefined_questions():
+    assert len(QUERY_CATALOG) == 5
+    assert find_query('  Show buildings constructed after 2010 ') is QUERY_CATALOG['Show buildings constructed after 2010']
+    assert find_query('Top 3 properties with the lowest monthly rent') is None
+    assert find_query(None) is None
+
+
+@pytest.mark.parametrize('question, expected', [
+    ("Find properties priced below 300 million KRW", ['c', 'a']),
+    ("Properties with the lowest price per square meter", ['a', 'b', 'e']),
+    ("Recommend properties that are south-facing and have a large area", ['e', 'a', 'c']),
+    ("List of properties with an area of 20 pyeong or more", ['e', 'd', 'b']),
+    ("Show buildings constructed after 2010", ['e', 'b']),
+])
+def test_catalog_queries(data, question, expected):
+    assert names(find_query(question).run(data)) == expected
+
+
+def test_area_threshold_is_twenty_pyeong(data):
+    data['representativeArea'] = [20 * PYEONG - 0.01, 20 * PYEONG, 30.0, 30.0, 30.0]
+    assert names(find_query("List of properties with an area of 20 pyeong or more").run(data)) == ['b']
+
+
+def test_summarize(data):
+    question = "Show buildings constructed after 2010"
+    query = find_query(question)
+    text = summarize(question, query, query.run(data), len(data))
+    assert text == f"2 of 5 properties match '{question}'. Top matches: e, b."
+
+
+def test_run_uses_catalog_without_llm(data):
+    df, result = run('강남역: ...', 'openai', data=data, question="Show buildings constructed after 2010")
+    assert list(df.columns) == ['Name', 'MinPrice', 'MaxPrice', 'Area', 'PropertyType', 'Build']
+    assert names(df) == ['e', 'b']
+    assert result['type'] == 'string' and result['value'].startswith('2 of 5')
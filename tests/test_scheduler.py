@@ -0,0 +1,60 @@
+import threading
+import pytest
+from gathering_data import scheduler
+from gathering_data.scheduler import NRequestScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', fake)
+    return fake
+
+
+def test_burst_of_failures_decreases_rate_once(clock):
+    s = NRequestScheduler(rate=50)
+    for _ in range(45):
+        s.record(ok=True)
+    for _ in range(8):
+        s.record(ok=False, retry_after='1')
+    assert s.rate == 25
+
+
+def test_rate_decreases_again_after_cooldown(clock):
+    s = NRequestScheduler(rate=50)
+    for _ in range(45):
+        s.record(ok=True)
+    for _ in range(8):
+        s.record(ok=False, retry_after='1')
+    clock.now += NRequestScheduler.DECREASE_COOLDOWN + 0.1
+    s.record(ok=False, retry_after='1')
+    assert s.rate == 12.5
+    s.record(ok=False, retry_after='1')
+    assert s.rate == 12.5
+
+
+def test_cooldown_covers_backoff_pause(clock):
+    # Retry-After가 쿨다운보다 길면 그동안 도착한 실패로는 다시 줄이지 않음
+    s = NRequestScheduler(rate=50)
+    for _ in range(10):
+        s.record(ok=False, retry_after='10')
+    clock.now += NRequestScheduler.DECREASE_COOLDOWN + 1
+    s.record(ok=False, retry_after='10')
+    assert s.rate == 25
+
+
+def test_concurrent_failures_decrease_rate_once():
+    s = NRequestScheduler(rate=50)
+    threads = [threading.Thread(target=s.record, kwargs={'ok': False, 'retry_after': '1'}) for _ in range(32)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert s.rate == 25
+    assert s.rate >= s.min_rate
@@ -0,0 +1,39 @@
+import time
+import pytest
+from gathering_data import cache
+from gathering_data.classes import NAddon
+from gathering_data.data_gatherer import NaverRECrawler
+from gathering_data.util import get_things_fetched_at, make_addon_search
+
+
+def raise_prices(stub):
+    for res in stub.fixture['complexes'].values():
+        for v in res:
+            if 'minDealPrice' in v:
+                v['minDealPrice'] += 10000
+
+
+@pytest.mark.parametrize('concurrent', [True, False])
+def test_search_without_cache_sees_new_listings(naver_stub, monkeypatch, concurrent):
+    monkeypatch.setenv('GOOGLE_API_KEY', 'stub')
+    crawler = NaverRECrawler(concurrent)
+    before = crawler.search_location('강남역')['minDeal'].max()
+    raise_prices(naver_stub)
+    assert crawler.search_location('강남역')['minDeal'].max() == before  # 디스크 캐시
+    assert crawler.search_location('강남역', use_cache=False)['minDeal'].max() == pytest.approx(before + 1)
+
+
+def test_things_fetched_at_comes_from_cache_entries(naver_stub, monkeypatch):
+    monkeypatch.setenv('GOOGLE_API_KEY', 'stub')
+    crawler = NaverRECrawler(False)
+    addon = make_addon_search()
+    start = time.time()
+    sector, _ = crawler.search('강남역')
+    fetched_at = get_things_fetched_at(sector, addon)
+    assert start <= fetched_at <= time.time()
+
+    # 캐시에서 읽은 결과는 처음 받은 시각을 유지
+    monkeypatch.setattr(cache.time, 'time', lambda: start + 600)
+    crawler.search('강남역')
+    assert get_things_fetched_at(sector, addon) == fetched_at
+    assert get_things_fetched_at(sector, make_addon_search([NAddon.TRADE_LEASE])) is None
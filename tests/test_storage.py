@@ -0,0 +1,100 @@
+import datetime
+import glob
+import os
+import pandas as pd
+import pytest
+from gathering_data.classes import *
+from gathering_data.storage import NEstateStore, get_partition_path, write_sector
+
+DAY1 = datetime.date(2024, 12, 1)
+DAY2 = datetime.date(2024, 12, 2)
+
+
+def make_sector(no, city, division):
+    return NSector('동' + no, NLocation(37.5, 127.0), no, city, division, [])
+
+
+def make_frame(names, deals, areas, types=None):
+    return pd.DataFrame({
+        'Name': names,
+        'Type': types if types else [NAddon.ESTATE_APT] * len(names),
+        'Dir': ['EE'] * len(names),
+        'minDeal': deals,
+        'maxDeal': [d * 1.5 for d in deals],
+        'representativeArea': areas,
+        'Lat': [37.5] * len(names),
+        'Lon': [127.0] * len(names),
+    })
+
+
+@pytest.fixture
+def store_root(tmp_path):
+    root = str(tmp_path / 'estate')
+    gangnam = make_sector('1168010100', '서울시', '강남구')
+    seocho = make_sector('1165010100', '서울시', '서초구')
+    write_sector(make_frame(['a', 'b', 'c'], [5.0, 12.0, 20.0], [59.0, 84.0, 114.0],
+                            [NAddon.ESTATE_APT, NAddon.ESTATE_OPST, NAddon.ESTATE_APT]), gangnam, DAY1, root)
+    write_sector(make_frame(['a', 'b'], [6.0, 13.0], [59.0, 84.0]), gangnam, DAY2, root)
+    write_sector(make_frame(['s'], [30.0], [135.0]), seocho, DAY2, root)
+    return root
+
+
+def test_write_sector_uses_hive_layout(store_root):
+    files = sorted(os.path.relpath(p, store_root) for p in glob.glob(os.path.join(store_root, '**', '*'),
+                                                                     recursive=True) if os.path.isfile(p))
+    assert files == [
+        os.path.join('city=서울시', 'division=강남구', 'crawl_date=2024-12-01', '1168010100.parquet'),
+        os.path.join('city=서울시', 'division=강남구', 'crawl_date=2024-12-02', '1168010100.parquet'),
+        os.path.join('city=서울시', 'division=서초구', 'crawl_date=2024-12-02', '1165010100.parquet'),
+    ]
+    assert get_partition_path('r', 'a/b', 'c=d', DAY1) == os.path.join('r', 'city=a_b', 'division=c_d',
+                                                                          'crawl_date=2024-12-01')
+
+
+def test_read_round_trip(store_root):
+    df = NEstateStore(store_root).read()
+    assert len(df) == 6
+    row = df[(df['Name'] == 'c')].iloc[0]
+    assert row['SectorNo'] == '1168010100' and row['Sector'] == '동1168010100'
+    assert row['city'] == '서울시' and row['division'] == '강남구'
+    assert pd.Timestamp(row['crawl_date']).date() == DAY1
+    assert row['minDeal'] == 20.0 and row['maxDeal'] == 30.0
+
+
+def test_read_filters(store_root):
+    store = NEstateStore(store_root)
+    names = lambda **kwargs: sorted(store.read(**kwargs)['Name'])
+    assert names(division='서초구') == ['s']
+    assert names(division='강남구', start=DAY2) == ['a', 'b']
+    assert names(end=DAY1) == ['a', 'b', 'c']
+    assert names(min_price=15, max_price=25) == ['b', 'b', 'c']  # 가격 범위가 겹치는 단지
+    assert names(min_area=80, max_area=120) == ['b', 'b', 'c']
+    assert names(types=[NAddon.ESTATE_OPST]) == ['b']
+    # 값은 바인딩 파라미터로 전달되므로 따옴표가 들어가도 SQL이 깨지지 않음
+    assert names(division="강남구' OR '1'='1") == []
+    assert list(store.read(city='서울시', columns=['Name', 'minDeal']).columns) == ['Name', 'minDeal']
+
+
+def test_rewrite_same_day_replaces_file_atomically(store_root, monkeypatch):
+    sector = make_sector('1168010100', '서울시', '강남구')
+    write_sector(make_frame(['z'], [1.0], [39.0]), sector, DAY1, store_root)
+    assert sorted(NEstateStore(store_root).read(start=DAY1, end=DAY1)['Name']) == ['z']
+
+    def broken(self, path, *args, **kwargs):
+        with open(path, 'wb') as f:
+            f.write(b'PAR1 partial')
+        raise OSError('disk full')
+
+    monkeypatch.setattr(pd.DataFrame, 'to_parquet', broken)
+    with pytest.raises(OSError):
+        write_sector(make_frame(['y'], [2.0], [39.0]), sector, DAY1, store_root)
+    monkeypatch.undo()
+    # 쓰다가 실패해도 기존 파일은 그대로, 임시 파일은 읽기 대상이 아님
+    assert sorted(NEstateStore(store_root).read(start=DAY1, end=DAY1)['Name']) == ['z']
+
+
+def test_empty_store(tmp_path):
+    store = NEstateStore(str(tmp_path / 'none'))
+    assert not store.ready
+    assert len(store.read(city='서울시')) == 0
+    assert list(store.read(columns=['Name']).columns) == ['Name']
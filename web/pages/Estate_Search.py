@@ -11,8 +11,12 @@ project_root = current_dir.parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+import time
 from analysis.PandasAI_Analysis import run, format_analysis_results
-from gathering_data.util import extract_location_from_query
+from gathering_data.classes import NAddon
+from gathering_data.heatmap import get_price_grid
+from gathering_data.metrics import get_metrics, start_metrics_server
+from gathering_data.util import extract_location_from_query, get_things_fetched_at, make_addon_search
 
 load_dotenv()
 
@@ -75,6 +79,28 @@ PREDEFINED_QUERIES = {
     ]
 }
 
+TRADE_TYPES = {"Sale(매매)": NAddon.TRADE_DEAL, "Jeonse(전세)": NAddon.TRADE_LEASE}
+ESTATE_TYPES = {"Apartment(아파트)": NAddon.ESTATE_APT, "Officetel(오피스텔)": NAddon.ESTATE_OPST}
+
+# 크롤링 결과 캐시 (모든 세션 공유)
+CRAWL_CACHE_TTL = 60 * 60  # seconds
+CRAWL_CACHE_MAX_ENTRIES = 64
+HEATMAP_LEVEL = 3  # 약 550m 격자
+
+
+@st.cache_resource
+def get_crawler():
+    from gathering_data.data_gatherer import NaverRECrawler
+    return NaverRECrawler()
+
+
+@st.cache_data(ttl=CRAWL_CACHE_TTL, max_entries=CRAWL_CACHE_MAX_ENTRIES, show_spinner=False)
+def crawl_location(location, trade_types: tuple, estate_types: tuple):
+    # 매물은 디스크 캐시(최대 1일)를 거쳐 받음 -> crawled_at은 사용한 캐시 항목 중 가장 오래된 수집 시각
+    sector, df = get_crawler().search(location, list(trade_types), list(estate_types))
+    fetched_at = get_things_fetched_at(sector, make_addon_search(list(trade_types), list(estate_types)))
+    return df, time.time() if fetched_at is None else fetched_at
+
 
 def parse_property_string(input_string):
     import ast
@@ -99,6 +125,41 @@ def parse_property_string(input_string):
     return df.head(display_rows)
 
 
+def show_price_heatmap(data, key):
+    # 단지 좌표 대신 격자별 중앙값만 차트로 보냄
+    if data is None or len(data) == 0 or 'Lat' not in data.columns: return
+    deal, lease = st.tabs(["Deal (median unit price)", "Lease (median unit price)"])
+    for tab, column in ((deal, 'medianDealUnit'), (lease, 'medianLeaseUnit')):
+        grid = get_price_grid(key, data, column, HEATMAP_LEVEL)
+        with tab:
+            if grid.count.sum() == 0:
+                st.caption("No price data")
+            else:
+                st.plotly_chart(grid.to_plotly('median'), use_container_width=True)
+
+
+def show_metrics_panel():
+    # 요청/단계별 소요 시간 (NRE_METRICS_PORT가 있으면 /metrics 로도 제공)
+    if not st.sidebar.checkbox("Show performance metrics", value=False):
+        return
+    metrics = get_metrics()
+    summary = metrics.get_summary()
+    with st.sidebar:
+        st.subheader("Timings (seconds)")
+        if summary:
+            st.dataframe(pd.DataFrame(summary), hide_index=True)
+        else:
+            st.caption("No measurements yet.")
+        counters = metrics.get_counters()
+        if counters:
+            st.subheader("Counters")
+            st.dataframe(pd.DataFrame(counters), hide_index=True)
+        st.download_button("Download (Prometheus text)", metrics.to_prometheus(), file_name="metrics.prom",
+                           mime="text/plain")
+        if st.button("Reset metrics"):
+            metrics.reset()
+
+
 def initialize_session_state():
     if 'search_history' not in st.session_state:
         st.session_state.search_history = []
@@ -108,6 +169,7 @@ def initialize_session_state():
 
 def main():
     initialize_session_state()
+    start_metrics_server()
 
     st.title("🏢 Korea Real Estate Search")
 
@@ -152,6 +214,12 @@ def main():
                 PREDEFINED_QUERIES[category]
             )
 
+    with st.expander("Filters"):
+        trade_labels = st.multiselect("Trade Type", list(TRADE_TYPES.keys()), default=list(TRADE_TYPES.keys()))
+        estate_labels = st.multiselect("Property Type", list(ESTATE_TYPES.keys()), default=list(ESTATE_TYPES.keys()))
+    trade_types = tuple(TRADE_TYPES[t] for t in trade_labels) or tuple(TRADE_TYPES.values())
+    estate_types = tuple(ESTATE_TYPES[e] for e in estate_labels) or tuple(ESTATE_TYPES.values())
+
     if st.button("Search"):
         if search_query:
             with st.spinner(f"Analyzing data..."):
@@ -163,7 +231,14 @@ def main():
                 
                     # Run the analysis
                     contextualized_query = f"{selected_location} ({selected_location_eng}): {search_query}"
-                    df, query_result = run(contextualized_query, "openai", location=selected_location)
+                    # 같은 위치/조건의 크롤링 결과는 캐시에서 가져옴
+                    requested_at = time.time()
+                    data, crawled_at = crawl_location(selected_location, trade_types, estate_types)
+                    from_cache = crawled_at < requested_at
+
+                    # 미리 정의된 질문은 로컬 쿼리로 처리, Direct Input만 LLM 사용
+                    question = None if "Direct" in query_method else search_query
+                    df, query_result = run(contextualized_query, "openai", data=data, question=question)
 
                     # 분석 결과 포맷팅
                     if df is not None:
@@ -179,6 +254,9 @@ def main():
 
                         # 결과 표시
                         st.success("Search completed.")
+                        if from_cache:
+                            age = int((requested_at - crawled_at) // 60)
+                            st.caption(f"Loaded from cache (crawled {age} min ago)")
                         st.markdown("### **📊 Analysis Summary**")
                         st.markdown(
                             '<small>Selected Location<br>'
@@ -214,6 +292,10 @@ def main():
                         # st.table(formatted_result["affordable_properties"], hide_index=True)
                         st.dataframe(formatted_result["affordable_properties"], hide_index=True)
 
+                        # 가격 분포
+                        st.markdown("### **Price Heatmap**")
+                        show_price_heatmap(data, (selected_location, trade_types, estate_types, crawled_at))
+
                     else:
                         st.error("There are no results for the property you're looking for")
 
@@ -229,5 +311,7 @@ def main():
     - Use predefined questions for common queries
     """)
 
+    show_metrics_panel()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
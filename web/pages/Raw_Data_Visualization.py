@@ -1,6 +1,18 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+import sys
+from pathlib import Path
+
+# Set project root directory
+current_dir = Path(__file__).resolve().parent
+project_root = current_dir.parent.parent
+
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from analysis.ingestion import UPLOAD_TYPES, get_memory_usage, hash_bytes, load_table
+from analysis.preprocessing import MISSING_VALUES, NORMALIZATION, OUTLIERS, STANDARDIZATION, \
+    make_preprocess_key, run_preprocessing
 
 
 def set_custom_style():
@@ -108,6 +120,16 @@ def initialize_session_state():
         st.session_state.x_axis = None
     if 'y_axis' not in st.session_state:
         st.session_state.y_axis = None
+    if 'df_digest' not in st.session_state:
+        st.session_state.df_digest = None
+    if 'upload_token' not in st.session_state:
+        st.session_state.upload_token = None
+    if 'processed_df' not in st.session_state:
+        st.session_state.processed_df = None
+    if 'preprocessing_key' not in st.session_state:
+        st.session_state.preprocessing_key = None
+    if 'preprocessing_report' not in st.session_state:
+        st.session_state.preprocessing_report = None
 
 
 def reset_session_state():
@@ -119,11 +141,38 @@ def reset_session_state():
     initialize_session_state()
 
 
-def handle_preprocessing():
+def load_upload(uploaded_file):
+    # 같은 업로드에 대해서는 rerun마다 해시를 다시 계산하지 않음, 파싱 결과는 해시로 캐시
+    token = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, 'file_id', None))
+    data = uploaded_file.getbuffer()
+    if st.session_state.upload_token != token:
+        st.session_state.upload_token = token
+        st.session_state.df_digest = hash_bytes(data)
+    _, df = load_table(data, uploaded_file.name, st.session_state.df_digest)
+    return df
+
+
+def handle_preprocessing(options):
     """전처리 로직을 처리하는 함수"""
+    if not st.session_state.selected_columns:
+        st.warning("Please select at least one column.")
+        return False
+    df, report = run_preprocessing(st.session_state.df_digest, st.session_state.df,
+                                   st.session_state.selected_columns, options)
+    st.session_state.processed_df = df
+    st.session_state.preprocessing_report = report
+    st.session_state.preprocessing_key = make_preprocess_key(st.session_state.df_digest,
+                                                             st.session_state.selected_columns, options)
     return True
 
 
+def get_chart_df():
+    # 전처리 결과가 있으면 그것으로, 없으면 원본으로 그림
+    if st.session_state.processed_df is not None:
+        return st.session_state.processed_df
+    return st.session_state.df
+
+
 def data_visualization():
     set_custom_style()
 
@@ -146,17 +195,16 @@ def data_visualization():
     with st.expander("STEP 1. Data Selection", expanded=st.session_state.current_step == 1):
         uploaded_file = st.file_uploader(
             "Upload your data",
-            type=["csv", "xlsx"],
+            type=UPLOAD_TYPES,
             help="* File size must be less than 200MB",
             key=f"file_uploader_{st.session_state.file_uploader_key}"
         )
 
         if uploaded_file is not None:
             try:
-                if uploaded_file.name.endswith('.csv'):
-                    st.session_state.df = pd.read_csv(uploaded_file, encoding='cp949')
-                else:
-                    st.session_state.df = pd.read_excel(uploaded_file)
+                st.session_state.df = load_upload(uploaded_file)
+                st.caption(f"{len(st.session_state.df):,} rows · {len(st.session_state.df.columns)} columns · "
+                           f"{get_memory_usage(st.session_state.df) / 1024 / 1024:.1f} MB in memory")
 
                 if st.button("Proceed to Preprocessing →", type="primary"):
                     st.session_state.current_step = 2
@@ -212,15 +260,30 @@ def data_visualization():
                     outliers = st.checkbox("Remove Outliers")
                     normalization = st.checkbox("Normalization")
 
+                options = [step for step, checked in ((STANDARDIZATION, standardization),
+                                                      (MISSING_VALUES, missing_values),
+                                                      (OUTLIERS, outliers),
+                                                      (NORMALIZATION, normalization)) if checked]
+                # 열이나 옵션이 바뀌면 다시 적용하도록 (같은 조합은 캐시에서 바로 가져옴)
+                if st.session_state.preprocessing_complete and st.session_state.preprocessing_key != \
+                        make_preprocess_key(st.session_state.df_digest, st.session_state.selected_columns, options):
+                    st.session_state.preprocessing_complete = False
+                    st.session_state.processed_df = None
+
                 preprocessing_col = st.container()
                 with preprocessing_col:
                     if not st.session_state.preprocessing_complete:
                         if st.button("Apply Preprocessing", type="primary"):
-                            if handle_preprocessing():
+                            if handle_preprocessing(options):
                                 st.session_state.preprocessing_complete = True
                                 st.rerun()
 
                     if st.session_state.preprocessing_complete:
+                        report = st.session_state.preprocessing_report
+                        st.caption(f"{report['rows_out']:,} of {report['rows']:,} rows · "
+                                   f"{report.get('imputed', 0):,} values imputed · "
+                                   f"{report.get('outlier_rows', 0):,} outlier rows removed")
+                        st.dataframe(st.session_state.processed_df.head(), hide_index=False)
                         if st.button("Proceed to Visualization →", type="primary"):
                             st.session_state.current_step = 3
                             st.rerun()
@@ -266,13 +329,13 @@ def data_visualization():
                     if x_axis and y_axis and st.session_state.chart_type:
                         fig = None
                         if st.session_state.chart_type == "bar":
-                            fig = px.bar(st.session_state.df, x=x_axis, y=y_axis, title="Bar Chart")
+                            fig = px.bar(get_chart_df(), x=x_axis, y=y_axis, title="Bar Chart")
                         elif st.session_state.chart_type == "scatter":
-                            fig = px.scatter(st.session_state.df, x=x_axis, y=y_axis, title="Scatter Plot")
+                            fig = px.scatter(get_chart_df(), x=x_axis, y=y_axis, title="Scatter Plot")
                         elif st.session_state.chart_type == "pie":
-                            fig = px.pie(st.session_state.df, values=y_axis, names=x_axis, title="Pie Chart")
+                            fig = px.pie(get_chart_df(), values=y_axis, names=x_axis, title="Pie Chart")
                         elif st.session_state.chart_type == "donut":
-                            fig = px.pie(st.session_state.df, values=y_axis, names=x_axis, title="Donut Chart",
+                            fig = px.pie(get_chart_df(), values=y_axis, names=x_axis, title="Donut Chart",
                                          hole=0.4)
 
                         if fig: